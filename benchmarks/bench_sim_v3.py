@@ -0,0 +1,137 @@
+import argparse
+import random
+
+from harness import use_app, timed, peak_kb, Suite
+
+use_app("sim_v3")
+
+import numpy as np
+
+from grid_v2 import GridV2, CODE_ROAD, CODE_XING, CODE_BUILD
+from pathfinding import shortest_path
+from engine import Engine
+from metrics import MetricsTracker
+
+
+def city_cells(n, block=4, drop=0.05, seed=0):
+    """
+    n x n 바둑판 도시: block 칸마다 도로, 도로가 만나는 곳은 교차로, 나머지는 건물.
+    도로 칸 일부(drop)를 건물로 막아 우회로가 생기게 한다 (seed 고정).
+    """
+    rng = np.random.default_rng(seed)
+    cells = np.full((n, n), CODE_BUILD, dtype=np.uint8)
+    lines = np.arange(0, n, block)
+    cells[lines, :] = CODE_ROAD
+    cells[:, lines] = CODE_ROAD
+    cells[np.ix_(lines, lines)] = CODE_XING
+    cut = (cells == CODE_ROAD) & (rng.random((n, n)) < drop)
+    cells[cut] = CODE_BUILD
+    return cells
+
+
+def road_pairs(grid, count, seed=0):
+    rng = random.Random(seed)
+    road = [tuple(p) for p in np.argwhere(grid.passable[1:-1, 1:-1]).tolist()]
+    return [(rng.choice(road), rng.choice(road)) for _ in range(count)]
+
+
+def bench_bfs(suite, sizes, pairs):
+    for n in sizes:
+        grid = GridV2.from_cells(city_cells(n))
+        jobs = road_pairs(grid, pairs)
+
+        def run():
+            for s, g in jobs:
+                shortest_path(grid, s, g)
+
+        t = timed(run)
+        suite.add(f"bfs.{n}", us_per_path=t / len(jobs) * 1e6, peak_kb=peak_kb(run))
+
+
+class HubGrid(GridV2):
+    """
+    목적지를 hubs 개 칸으로 제한한 격자 (출발은 원래대로 A zone 전체).
+    목적지가 모두 다르면 차량마다 거리장 BFS 를 새로 만들어서 준비 시간만 재게 되므로,
+    tick 벤치마크는 "N 대가 hubs 개 목적지로 향하는" 고정 시나리오로 잰다.
+    """
+
+    def set_hubs(self, hubs, seed=0):
+        rng = random.Random(seed)
+        cells = self.zone_cells("C")
+        self.hubs = [cells[rng.randrange(len(cells))] for _ in range(hubs)]
+
+    def get_spawn_and_goal(self, rng=None):
+        start, _ = super().get_spawn_and_goal(rng)
+        return start, rng.choice(self.hubs)
+
+
+def make_engine(grid, vehicles, vectorized):
+    engine = Engine(grid, spawn_interval=1e9, rng=random.Random(0), vectorized=vectorized)
+    for _ in range(vehicles):
+        engine.spawn()
+    engine.step()  # 거리장 캐시 준비
+    return engine
+
+
+def bench_ticks(suite, counts, ticks, size, hubs=32):
+    grid = HubGrid(None, cells=city_cells(size))
+    grid.set_hubs(hubs)
+    for vectorized in (False, True):
+        mode = "fleet" if vectorized else "objects"
+        for n in counts:
+            # 메모리: 차량 생성 + 첫 tick (tracemalloc 은 느리므로 만든 엔진을 그대로 시간 측정에 재사용)
+            box = []
+            kb = peak_kb(lambda: box.append(make_engine(grid, n, vectorized)))
+            engine = box[0]
+
+            def run():
+                for _ in range(ticks):
+                    engine.step()
+
+            t = timed(run, rounds=3)
+            suite.add(f"tick.{mode}.{n}", ticks_per_sec=ticks / t,
+                      us_per_vehicle_tick=t / ticks / n * 1e6, peak_kb=kb)
+
+
+def bench_metrics(suite, trips):
+    grid = GridV2.from_cells(city_cells(64))
+    rng = random.Random(0)
+    log = [(rng.choice("ABC"), rng.choice("ABC"), rng.uniform(1.0, 60.0)) for _ in range(trips)]
+    rounds = 3
+    # 빈 tracker 를 미리 만들어 둔다: 생성 시 zone BFS 는 측정에서 빼고, 매 round 는 빈 상태에서 시작
+    # (timed rounds + compute 용 1 개 + peak_kb 1 개)
+    trackers = [MetricsTracker(grid) for _ in range(rounds + 2)]
+
+    def fill():
+        m = trackers.pop()
+        for o, d, t in log:
+            m.log_trip(o, d, t)
+        return m
+
+    t_log = timed(fill, rounds=rounds)
+    tracker = fill()
+    t_compute = timed(lambda: [tracker.compute() for _ in range(1000)]) / 1000
+    suite.add(f"metrics.{trips}", us_per_trip=t_log / trips * 1e6,
+              us_per_compute=t_compute * 1e6, peak_kb=peak_kb(fill))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="sim_v3 벤치마크")
+    parser.add_argument("--quick", action="store_true", help="작은 규모로 빠르게")
+    parser.add_argument("--out", required=True, help="결과 JSON 경로")
+    args = parser.parse_args()
+
+    suite = Suite("sim_v3")
+    if args.quick:
+        bench_bfs(suite, [32, 64], pairs=10)
+        bench_ticks(suite, [100, 1000], ticks=20, size=128)
+        bench_metrics(suite, 10000)
+    else:
+        bench_bfs(suite, [64, 128, 256, 512], pairs=20)
+        bench_ticks(suite, [100, 1000, 10000], ticks=60, size=256)
+        bench_metrics(suite, 100000)
+    suite.emit(args.out)
+
+
+if __name__ == "__main__":
+    main()
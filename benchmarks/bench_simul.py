@@ -0,0 +1,172 @@
+import argparse
+import os
+import random
+import tempfile
+
+from harness import use_app, timed, peak_kb, Suite
+
+use_app("simul")
+
+import simulation
+from grid import Grid
+from sig_nal import SignalMap
+from simulation import Simulation
+from event_simulation import EventSimulation
+from utils import shortest_path, cached_path
+
+DATA_FILES = ["road_map.txt", "capacity_map.txt", "lane_change_map.txt", "turn_map.txt",
+              "speed_limit_map.txt", "closed_cells.txt", "stop_line.txt"]
+
+
+def write_scenario(folder, n, vehicles=0, signals=0, block=4, seed=0):
+    """
+    n x n 바둑판 시나리오 폴더 생성 (seed 고정).
+    block 칸마다 도로(R), 교차점은 교차로(C), 나머지 건물(B).
+    교차로 중 signals 개에 3현시 신호와 정지선, 임의 출발/도착 차량 vehicles 대.
+    """
+    rng = random.Random(seed)
+    rows = []
+    for r in range(n):
+        row = ""
+        for c in range(n):
+            on_r, on_c = r % block == 0, c % block == 0
+            row += "C" if on_r and on_c else "R" if on_r or on_c else "B"
+        rows.append(row)
+    road = [(r, c) for r in range(n) for c in range(n) if rows[n - 1 - r][c] != "B"]
+    xings = [(r, c) for r, c in road if r % block == 0 and c % block == 0 and 0 < r < n - 1 and 0 < c < n - 1]
+
+    files = {name: [] for name in DATA_FILES}
+    files["road_map.txt"] = rows
+    files["capacity_map.txt"] = [f"{r},{c},2" for r, c in road]
+    patterns, stops = [], []
+    for r, c in rng.sample(xings, min(signals, len(xings))):
+        green = rng.randint(5, 20)
+        patterns += [f"{r},{c},N-green;L-red;R-green,{green}",
+                     f"{r},{c},N-yellow;L-red;R-red,3",
+                     f"{r},{c},N-red;L-green;R-red,{rng.randint(5, 20)}"]
+        stops += [f"{r - 1},{c}", f"{r},{c - 1}"]
+    files["stop_line.txt"] = stops
+    files["signal_patterns.txt"] = patterns
+    files["vehicle_data.txt"] = [
+        f"{a[0]},{a[1]},R,{rng.choice([30, 40, 50, 60])},{b[0]},{b[1]},0"
+        for a, b in ((rng.choice(road), rng.choice(road)) for _ in range(vehicles))
+    ]
+    for name, lines in files.items():
+        with open(os.path.join(folder, name), "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + ("\n" if lines else ""))
+    return road
+
+
+def load_grid(folder):
+    return Grid(*[os.path.join(folder, name) for name in DATA_FILES])
+
+
+def bench_astar(suite, sizes, pairs):
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as folder:
+            road = write_scenario(folder, n)
+            grid = load_grid(folder)
+            rng = random.Random(0)
+            jobs = [(rng.choice(road), rng.choice(road)) for _ in range(pairs)]
+            shortest_path(grid, jobs[0][0], jobs[0][1], 50, 0)  # 셀 비용 캐시 준비
+
+            def run():
+                for s, g in jobs:
+                    shortest_path(grid, s, g, 50, 0)
+
+            t = timed(run)
+            suite.add(f"astar.{n}", us_per_path=t / len(jobs) * 1e6, peak_kb=peak_kb(run))
+
+
+def bench_routes(suite, sizes, pairs, goals=8):
+    """
+    cached_path (Vehicle 이 실제로 쓰는 경로): 차량 pairs 대가 목적지 goals 곳을 나눠 쓴다.
+    cold = 빈 route_cache 에서 시작 (goal 별 트리 생성 포함), warm = 트리가 모두 캐시에 있을 때.
+    """
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as folder:
+            road = write_scenario(folder, n)
+            grid = load_grid(folder)
+            rng = random.Random(0)
+            hubs = rng.sample(road, goals)
+            jobs = [(rng.choice(road), rng.choice(hubs)) for _ in range(pairs)]
+            cached_path(grid, jobs[0][0], jobs[0][1], 50, 0)  # 셀 비용 캐시 준비
+
+            def warm():
+                for s, g in jobs:
+                    cached_path(grid, s, g, 50, 0)
+
+            def cold():
+                grid.route_cache.clear()
+                warm()
+
+            suite.add(f"route.{n}", us_per_path_cold=timed(cold) / len(jobs) * 1e6,
+                      us_per_path_warm=timed(warm) / len(jobs) * 1e6, peak_kb=peak_kb(cold))
+
+
+def bench_signals(suite, counts, seconds, dt=0.04):
+    for k in counts:
+        with tempfile.TemporaryDirectory() as folder:
+            write_scenario(folder, 4 * int(k ** 0.5) + 8, signals=k)
+            signal_map = SignalMap(os.path.join(folder, "signal_patterns.txt"))
+        steps = int(seconds / dt)
+
+        def run():
+            signal_map.seek(0)
+            for i in range(steps):
+                signal_map.get_states(i * dt)
+
+        t = timed(run)
+        suite.add(f"signals.{k}", us_per_call=t / steps * 1e6, peak_kb=peak_kb(run))
+
+
+def bench_ticks(suite, counts, ticks, size):
+    for engine in (Simulation, EventSimulation):
+        mode = "event" if engine is EventSimulation else "frame"
+        for n in counts:
+            with tempfile.TemporaryDirectory() as folder:
+                write_scenario(folder, size, vehicles=n, signals=16)
+                simulation.BASE_PATH = folder
+
+                # 메모리: 시나리오 로드 + 첫 tick (모든 차량 A* 경로 계산 포함)
+                box = []
+
+                def build():
+                    sim = engine()
+                    sim.update()
+                    box.append(sim)
+
+                kb = peak_kb(build)
+                sim = box[0]
+
+                def run():
+                    for _ in range(ticks):
+                        sim.update()
+
+                t = timed(run, rounds=3)
+                suite.add(f"tick.{mode}.{n}", ticks_per_sec=ticks / t,
+                          us_per_vehicle_tick=t / ticks / n * 1e6, peak_kb=kb)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="simul 벤치마크")
+    parser.add_argument("--quick", action="store_true", help="작은 규모로 빠르게")
+    parser.add_argument("--out", required=True, help="결과 JSON 경로")
+    args = parser.parse_args()
+
+    suite = Suite("simul")
+    if args.quick:
+        bench_astar(suite, [32, 64], pairs=10)
+        bench_routes(suite, [32, 64], pairs=100)
+        bench_signals(suite, [10, 100], seconds=60)
+        bench_ticks(suite, [100, 1000], ticks=25, size=48)
+    else:
+        bench_astar(suite, [64, 128, 256], pairs=20)
+        bench_routes(suite, [64, 128, 256], pairs=1000)
+        bench_signals(suite, [10, 100, 1000], seconds=600)
+        bench_ticks(suite, [100, 1000, 10000], ticks=100, size=64)
+    suite.emit(args.out)
+
+
+if __name__ == "__main__":
+    main()
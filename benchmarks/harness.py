@@ -0,0 +1,71 @@
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def use_app(name):
+    """sim_v3 / simul 폴더를 import 경로 맨 앞에 (두 앱은 모듈 이름이 겹치므로 프로세스당 하나만)"""
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    sys.path.insert(0, os.path.join(ROOT, name))
+
+
+def timed(fn, rounds=5):
+    """
+    fn 1회 소요 시간(초): rounds 번 재서 가장 빠른 값 (다른 프로세스 간섭 등 잡음 제거).
+    측정 중에는 GC 를 꺼서 수거 시점에 따른 흔들림을 줄인다.
+    """
+    gc.collect()
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        best = float("inf")
+        for _ in range(rounds):
+            t0 = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - t0)
+        return best
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def peak_kb(fn):
+    """fn 1회 실행 중 파이썬 할당(NumPy 포함) 최대치 KB (tracemalloc, 시간 측정과 별도 실행)"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1024.0
+    finally:
+        tracemalloc.stop()
+
+
+class Suite:
+    """
+    벤치마크 결과 모음.
+    results[name] = {metric: value}  (metric 이름 접미사로 방향을 정한다: run.py 의 HIGHER_IS_BETTER 참고)
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.results = {}
+
+    def add(self, name, **metrics):
+        self.results[f"{self.app}.{name}"] = {k: round(v, 3) for k, v in metrics.items()}
+        print(f"  {self.app}.{name}: " + ", ".join(f"{k}={v:.3f}" for k, v in metrics.items()),
+              file=sys.stderr)
+
+    def emit(self, path):
+        """결과 JSON 저장 (run.py 가 읽어서 합친다. 앱이 찍는 로그와 섞이지 않게 파일로)"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "app": self.app,
+                "python": platform.python_version(),
+                "results": self.results,
+            }, f, indent=2)
@@ -0,0 +1,92 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# 앱마다 모듈 이름이 겹치므로 (headless, profiler, main ...) 스위트는 각각 별도 프로세스로 실행
+SUITES = {
+    "sim_v3": "bench_sim_v3.py",
+    "simul": "bench_simul.py",
+}
+
+# metric 이름으로 방향 판정: 높을수록 좋은 지표, 나머지는 낮을수록 좋음 (us_*, *_kb)
+HIGHER_IS_BETTER = ("ticks_per_sec",)
+
+
+def run_suites(names, quick):
+    results = {}
+    for name in names:
+        print(f"[{name}]", file=sys.stderr)
+        with tempfile.TemporaryDirectory() as tmp:
+            out = os.path.join(tmp, "result.json")
+            cmd = [sys.executable, os.path.join(HERE, SUITES[name]), "--out", out]
+            if quick:
+                cmd.append("--quick")
+            subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL)
+            with open(out, encoding="utf-8") as f:
+                results.update(json.load(f)["results"])
+    return results
+
+
+def compare(current, baseline, threshold):
+    """
+    baseline 대비 threshold(비율) 이상 나빠진 항목 목록.
+    return: [(benchmark, metric, baseline 값, 현재 값, 변화율), ...]
+    """
+    regressions = []
+    for bench, metrics in sorted(current.items()):
+        base = baseline.get(bench)
+        if base is None:
+            continue
+        for metric, value in metrics.items():
+            old = base.get(metric)
+            if not old:
+                continue
+            change = (value - old) / old
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            if worse > threshold:
+                regressions.append((bench, metric, old, value, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="벤치마크 실행 + 기준값 대비 회귀 검사")
+    parser.add_argument("--suites", nargs="+", choices=sorted(SUITES), default=sorted(SUITES))
+    parser.add_argument("--quick", action="store_true", help="작은 규모로 빠르게 (CI 용)")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--baseline", default=None, help="비교할 이전 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=0.10, help="회귀로 볼 악화 비율 (기본 10%%)")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    results = run_suites(args.suites, args.quick)
+    report = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": sys.version.split()[0],
+        "quick": args.quick,
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"{len(results)} benchmarks in {time.perf_counter() - t0:.1f}s -> {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("quick") != args.quick:
+            print("[Warning] baseline was recorded with a different --quick setting")
+        regressions = compare(results, baseline["results"], args.threshold)
+        for bench, metric, old, new, change in regressions:
+            print(f"REGRESSION {bench} {metric}: {old:.3f} -> {new:.3f} ({change:+.1%})")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions over {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
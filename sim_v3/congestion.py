@@ -0,0 +1,183 @@
+import heapq
+from array import array
+
+import numpy as np
+
+INF = float("inf")
+
+
+def cost_field(grid, goal, travel):
+    """
+    goal 에서 거꾸로 Dijkstra. 셀 j 에 들어가는 비용 = travel[j].
+
+    return: grid.mask 와 같은 길이의 float 배열,
+            field[grid.index(r, c)] = goal 까지 예상 통행시간 (도달 불가 = INF)
+    """
+    field = array("d", [INF]) * len(grid.mask)
+
+    gr, gc = goal
+    if not grid.is_road(gr, gc):
+        return field
+
+    mask = grid.mask
+    offsets = grid.offsets()
+    g = grid.index(gr, gc)
+    field[g] = 0.0
+    heap = [(0.0, g)]
+
+    while heap:
+        d, j = heapq.heappop(heap)
+        if d > field[j]:
+            continue
+        # 이웃 i 에서 j 로 들어오는 비용
+        nd = d + travel[j]
+        for o in offsets:
+            i = j + o
+            if mask[i] and nd < field[i]:
+                field[i] = nd
+                heapq.heappush(heap, (nd, i))
+
+    return field
+
+
+class CongestionRouter:
+    """
+    실시간 혼잡도 기반 경로 선택 (DistanceFields 와 같은 인터페이스).
+
+    셀별 통행시간 추정치 = 1 + weight × (그 셀의 차량 수) 를 지수평활(alpha)로 유지하고,
+    refresh_interval 초마다 한 번만 갱신한다. goal 별 비용장은 필요할 때 Dijkstra 로 만들고
+    다음 갱신까지 모든 차량이 공유한다. 갱신 때 도로 셀 전체의 비용 변화 총량이
+    현재 비용장을 만든 비용 합의 tolerance 배 미만이면 기존 비용장을 그대로 둔다
+    (셀 하나의 상대 변화로 재면 빈 칸에 차 한 대만 들어와도 넘으므로 총량으로 비교).
+
+    차량은 매 tick 비용장의 경사(이웃 중 통행시간 합이 가장 작은 칸)를 따라가므로
+    갱신된 비용에 맞춰 자동으로 경로를 바꾼다.
+    """
+
+    def __init__(self, grid, refresh_interval=5.0, alpha=0.3, weight=2.0, tolerance=0.05):
+        self.grid = grid
+        self.refresh_interval = refresh_interval
+        self.alpha = alpha
+        self.weight = weight
+        self.tolerance = tolerance
+
+        self.version = None
+        self.last_refresh = -INF
+        self.reset()
+
+    def reset(self):
+        """맵 크기/구조가 바뀌면 추정치를 자유 흐름(셀당 1)으로 초기화"""
+        n = len(self.grid.mask)
+        self.travel = np.ones(n)          # 지수평활된 셀별 통행시간
+        self.used = self.travel.copy()    # 현재 비용장을 만든 통행시간
+        self.costs = self.used.tolist()   # Dijkstra 용 (스칼라 조회가 빠른 리스트)
+        self.road = np.frombuffer(self.grid.mask, dtype=np.bool_).copy()  # 변화량을 잴 도로 셀
+        self.fields = {}
+        self.hops = {}
+        self.version = self.grid.version
+
+    # ----------------------------------------
+    # 체크포인트 (비용장은 used 에서 다시 만든다)
+    # ----------------------------------------
+    def checkpoint_state(self):
+        return {"travel": self.travel.copy(), "used": self.used.copy(),
+                "last_refresh": self.last_refresh, "version": self.version}
+
+    def restore_state(self, state):
+        self.travel = state["travel"].copy()
+        self.used = state["used"].copy()
+        self.costs = self.used.tolist()
+        self.road = np.frombuffer(self.grid.mask, dtype=np.bool_).copy()
+        self.fields = {}
+        self.hops = {}
+        self.last_refresh = state["last_refresh"]
+        self.version = state["version"]
+
+    # ----------------------------------------
+    # 비용 갱신
+    # ----------------------------------------
+    def due(self, now):
+        return now - self.last_refresh >= self.refresh_interval
+
+    def refresh(self, now, counts):
+        """
+        counts: grid.mask 와 같은 길이의 셀별 차량 수 배열
+        (OccupancyIndex.to_array 또는 Fleet 셀 인덱스의 bincount)
+        """
+        self.last_refresh = now
+        if self.version != self.grid.version:
+            self.reset()
+
+        target = 1.0 + self.weight * counts
+        self.travel += self.alpha * (target - self.travel)
+
+        road = self.road
+        change = np.abs(self.travel[road] - self.used[road]).sum()
+        if change < self.tolerance * self.used[road].sum():
+            return False
+
+        self.used = self.travel.copy()
+        self.costs = self.used.tolist()
+        self.fields.clear()
+        self.hops.clear()
+        return True
+
+    # ----------------------------------------
+    # 경로 조회
+    # ----------------------------------------
+    def get(self, goal):
+        if self.version != self.grid.version:
+            self.reset()
+
+        field = self.fields.get(goal)
+        if field is None:
+            field = cost_field(self.grid, goal, self.costs)
+            self.fields[goal] = field
+        return field
+
+    def next_hop(self, cell, goal):
+        """
+        goal 까지 예상 통행시간이 가장 짧아지는 이웃 칸.
+        이미 goal 이거나 도달 불가면 None.
+        """
+        field = self.get(goal)
+        grid = self.grid
+        r, c = cell
+        if not (0 <= r < grid.rows and 0 <= c < grid.cols) or cell == goal:
+            return None
+
+        i = grid.index(r, c)
+        if field[i] == INF:
+            return None
+
+        costs = self.costs
+        best, best_j = INF, -1
+        for o in grid.offsets():
+            j = i + o
+            v = costs[j] + field[j]
+            if v < best:
+                best, best_j = v, j
+        if best_j < 0:
+            return None
+        return grid.coords(best_j)
+
+    def hop_array(self, goal):
+        """next_hop 을 모든 셀에 대해 한 번에 계산 (Fleet 용, 덧댄 평면 인덱스)"""
+        field = self.get(goal)
+        hop = self.hops.get(goal)
+        if hop is not None:
+            return hop
+
+        f = np.frombuffer(field, dtype=np.float64)
+        hop = np.full(len(f), -1, dtype=np.int64)
+        idx = np.flatnonzero(np.isfinite(f) & (f > 0))
+
+        best = np.full(len(idx), INF)
+        for o in self.grid.offsets():
+            v = self.used[idx + o] + f[idx + o]
+            better = v < best
+            best[better] = v[better]
+            hop[idx[better]] = idx[better] + o
+
+        self.hops[goal] = hop
+        return hop
@@ -0,0 +1,72 @@
+import argparse
+import os
+
+# grid_v2 가 pygame 을 import 하므로 환영 문구 숨김
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+
+from grid_v2 import CELL_EMPTY, CODE_EMPTY, TILE_CODES
+
+
+def scan(path):
+    """1차 패스: 빈 줄을 뺀 행 수와 최대 열 수 (한 줄씩 읽으므로 메모리 일정)"""
+    rows = cols = 0
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                rows += 1
+                cols = max(cols, len(line.rstrip("\n")))
+    return rows, cols
+
+
+def convert(src, dst, block_rows=1024):
+    """
+    글리프 텍스트 맵 → (rows, cols) uint8 셀 코드 .npy (GridV2.load 와 같은 규칙).
+    출력 파일을 메모리 매핑으로 열어 block_rows 줄씩 채우므로
+    맵 전체를 메모리에 올리지 않는다.
+    """
+    rows, cols = scan(src)
+    out = np.lib.format.open_memmap(dst, mode="w+", dtype=np.uint8, shape=(rows, cols))
+
+    def flush(lo, lines):
+        text = "".join(l.ljust(cols, CELL_EMPTY) for l in lines)
+        glyphs = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+        block = np.full(len(glyphs), CODE_EMPTY, dtype=np.uint8)
+        for tile, code in TILE_CODES.items():
+            block[glyphs == ord(tile)] = code
+        out[lo:lo + len(lines)] = block.reshape(len(lines), cols)
+
+    lo = 0
+    lines = []
+    with open(src, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            lines.append(line.rstrip("\n"))
+            if len(lines) == block_rows:
+                flush(lo, lines)
+                lo += len(lines)
+                lines = []
+    if lines:
+        flush(lo, lines)
+
+    out.flush()
+    del out
+    return rows, cols
+
+
+def main():
+    parser = argparse.ArgumentParser(description="텍스트 맵을 메모리 매핑용 .npy 로 변환")
+    parser.add_argument("src", help="글리프 텍스트 맵 (road_map.txt)")
+    parser.add_argument("dst", nargs="?", help="출력 .npy (기본값: src 확장자만 바꿈)")
+    parser.add_argument("--block-rows", type=int, default=1024, help="한 번에 변환할 줄 수")
+    args = parser.parse_args()
+
+    dst = args.dst or os.path.splitext(args.src)[0] + ".npy"
+    rows, cols = convert(args.src, dst, args.block_rows)
+    print(f"{args.src} -> {dst} ({rows} x {cols}, {os.path.getsize(dst)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+import os
+import pickle
+import random
+
+# headless 실행 시 pygame 환영 문구가 결과 출력에 섞이지 않게
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+
+from vehicle_v2 import VehiclePool
+from fleet import Fleet
+from metrics import MetricsTracker
+from pathfinding import DistanceFields
+from congestion import CongestionRouter
+from occupancy import OccupancyIndex
+from profiler import PhaseTimer
+from trip_sink import TripSink
+
+SIM_DT = 1.0 / 60.0  # 시뮬레이션 1 tick (초)
+CHECKPOINT_VERSION = 1  # 체크포인트 형식이 바뀌면 올린다
+
+
+class Engine:
+    """
+    화면 없이 돌아가는 시뮬레이션 본체.
+
+    시간은 고정 dt 로만 진행되므로 GUI(main.py)에서 돌리든
+    headless 로 CPU 최대 속도로 돌리든 같은 차량/통계가 나온다.
+
+    vectorized=True 이면 차량을 VehicleV2 객체 대신 Fleet(NumPy 배열)에 담아
+    tick 마다 한 번에 이동시킨다 (수천~수만 대용).
+
+    routing="congestion" 이면 최단 칸 수(BFS) 대신 실시간 혼잡도 기반 비용으로
+    경로를 고른다. 비용은 refresh_interval 초마다 갱신된다.
+
+    trip_log 경로를 주면 도착 차량 기록을 TripSink 로 실행 중에 계속 파일에 쓴다.
+
+    profiler(PhaseTimer) 를 켜 두면 tick 안의 spawn/refresh/update 구간 시간을 잰다.
+
+    heatmap(HeatmapRecorder) 을 주면 interval 초마다 셀별 점유/진입 횟수 프레임을 쌓는다.
+
+    save_checkpoint/load_checkpoint 로 전체 상태(차량, 스폰 rng, 시계, 통계, 혼잡 비용,
+    기록 버퍼)를 저장/복원하면 끊김 없이 돌린 것과 비트 단위로 같은 결과로 이어 달린다.
+    """
+
+    def __init__(self, grid, spawn_interval=1.0, speed=3.0, dt=SIM_DT, rng=None,
+                 vectorized=False, routing="bfs", refresh_interval=5.0, trip_log=None,
+                 profiler=None, heatmap=None):
+        self.grid = grid
+        self.dt = dt
+        self.spawn_interval = spawn_interval
+        self.speed = speed  # 칸/초
+        self.rng = rng      # 스폰용 random.Random (None 이면 전역 random)
+        self.profiler = profiler or PhaseTimer()  # 기본값: 꺼진 타이머
+
+        self.time = 0.0
+        self.ticks = 0
+        self.spawn_timer = 0.0
+        self.vehicles = []
+        self.pool = VehiclePool()           # 도착 차량 재사용
+
+        self.metrics = MetricsTracker(grid)
+        self.occupancy = OccupancyIndex()   # 셀별 차량 수 (충돌 체크용)
+
+        # 경로 선택: goal 별 BFS 거리장 캐시 또는 혼잡도 기반 비용장
+        self.routing = routing
+        if routing == "congestion":
+            self.fields = CongestionRouter(grid, refresh_interval)
+        elif routing == "bfs":
+            self.fields = DistanceFields(grid)
+        else:
+            raise ValueError(f"unknown routing mode: {routing}")
+
+        self.fleet = Fleet(grid, self.fields, self.metrics.zones) if vectorized else None
+
+        # 도착 기록 스트리밍 (None 이면 메모리 통계만)
+        self.sink = TripSink(trip_log) if trip_log else None
+
+        # 혼잡 히트맵 기록 (셀 경계 통과 횟수는 켰을 때만 센다)
+        self.heatmap = None
+        if heatmap is not None:
+            self.attach_heatmap(heatmap)
+
+    def attach_heatmap(self, heatmap):
+        """
+        HeatmapRecorder 를 붙이고 지금부터 셀 진입 횟수를 센다 (실행 중에 붙여도 됨).
+        첫 프레임은 붙인 시점부터 interval 초 뒤.
+        """
+        self.heatmap = heatmap
+        heatmap.next_time = max(heatmap.next_time, self.time + heatmap.interval)
+        if self.fleet is not None:
+            self.fleet.entries = np.zeros(len(self.grid.mask), dtype=np.int64)
+        else:
+            self.occupancy.entries = {}
+
+    # ----------------------------------------
+    # 차량 스폰
+    # ----------------------------------------
+    def spawn(self):
+        start, goal = self.grid.get_spawn_and_goal(self.rng)
+        if not (start and goal):
+            return None
+
+        if self.fleet is not None:
+            self.fleet.add(start, goal, self.speed,
+                           self.grid.zone_of(start[0]), self.grid.zone_of(goal[0]))
+            return None
+
+        v = self.pool.acquire(start, goal, self.speed)
+        v.origin_zone = self.grid.zone_of(start[0])  # A/B/C
+        v.dest_zone = self.grid.zone_of(goal[0])     # A/B/C
+        self.vehicles.append(v)
+        self.occupancy.add(v.cell)
+        return v
+
+    # ----------------------------------------
+    # 1 tick 진행
+    # ----------------------------------------
+    def step(self):
+        dt = self.dt
+        prof = self.profiler
+
+        self.spawn_timer += dt
+        if self.spawn_timer >= self.spawn_interval:
+            self.spawn_timer = 0.0
+            with prof.phase("spawn"):
+                self.spawn()
+
+        if self.routing == "congestion" and self.fields.due(self.time):
+            with prof.phase("refresh"):
+                self.fields.refresh(self.time, self.occupancy_counts())
+
+        with prof.phase("update"):
+            if self.fleet is not None:
+                self.step_fleet(dt)
+            else:
+                self.step_vehicles(dt)
+
+        if self.sink is not None:
+            self.sink.poll(self.time)
+        self.time += dt
+        self.ticks += 1
+
+        if self.heatmap is not None and self.heatmap.due(self.time):
+            with prof.phase("heatmap"):
+                self.record_heatmap()
+
+    def step_vehicles(self, dt):
+        # 도착 차량은 빼고 남은 차량을 같은 리스트 앞쪽으로 당긴다 (새 리스트 없음).
+        # 갱신 순서가 충돌 시 우선순위라서 swap-remove 대신 순서를 지키는 압축을 쓴다.
+        vehicles = self.vehicles
+        n = 0
+        for v in vehicles:
+            v.update(self.grid, dt, self.occupancy, self.fields)
+            if v.arrived:
+                # 도착한 애들만 로그에 기록
+                self.occupancy.remove(v.cell)
+                self.metrics.log_trip(v.origin_zone, v.dest_zone, v.total_time)
+                if self.sink is not None:
+                    self.sink.add(self.time, v.origin_zone, v.dest_zone, v.total_time)
+                self.pool.release(v)
+            else:
+                vehicles[n] = v
+                n += 1
+        del vehicles[n:]
+
+    def step_fleet(self, dt):
+        zones = self.metrics.zones
+        origins, dests, times = self.fleet.step(dt)
+        origins = [zones[o] for o in origins.tolist()]
+        dests = [zones[d] for d in dests.tolist()]
+        times = times.tolist()
+        for o, d, t in zip(origins, dests, times):
+            self.metrics.log_trip(o, d, t)
+        if self.sink is not None:
+            self.sink.extend(self.time, origins, dests, times)
+
+    def occupancy_counts(self):
+        """셀별 차량 수 배열 (grid.mask 와 같은 길이)"""
+        if self.fleet is not None:
+            return np.bincount(self.fleet.cells(), minlength=len(self.grid.mask)).astype(float)
+        return self.occupancy.to_array(self.grid)
+
+    def flow_counts(self):
+        """지난 히트맵 프레임 이후 셀별 진입 횟수 배열 (grid.mask 와 같은 길이), 읽으면 0 으로"""
+        if self.fleet is not None:
+            flow = self.fleet.entries.copy()
+            self.fleet.entries[:] = 0
+            return flow
+        flow = self.occupancy.to_array(self.grid, self.occupancy.entries)
+        self.occupancy.entries.clear()
+        return flow
+
+    def record_heatmap(self):
+        shape = (self.grid.rows + 2, self.grid.width)
+        occ = self.occupancy_counts().reshape(shape)[1:-1, 1:-1]
+        flow = self.flow_counts().reshape(shape)[1:-1, 1:-1]
+        self.heatmap.record(self.time, occ, flow)
+
+    def views(self):
+        """그리기용 차량 목록"""
+        if self.fleet is not None:
+            return self.fleet.views()
+        return self.vehicles
+
+    def run(self, duration, checkpoint=None, checkpoint_interval=300.0):
+        """
+        duration 초(시뮬레이션 시간)만큼 진행하고 최종 지표를 반환.
+        checkpoint 경로를 주면 checkpoint_interval 초마다 (시작부터 센 tick 기준) 상태를 저장한다.
+        """
+        every = max(1, int(round(checkpoint_interval / self.dt)))
+        for _ in range(int(round(duration / self.dt))):
+            self.step()
+            if checkpoint and self.ticks % every == 0:
+                self.save_checkpoint(checkpoint)
+        if self.sink is not None:
+            self.sink.flush(self.time)
+        return self.metrics.compute()
+
+    # ----------------------------------------
+    # 체크포인트
+    # ----------------------------------------
+    def checkpoint_state(self):
+        """
+        이어 달리기에 필요한 동적 상태만 모은 dict.
+        맵/거리장 캐시처럼 입력에서 다시 만들 수 있는 것은 넣지 않는다
+        (단, 실행 중 set_tile 로 바뀐 맵은 셀 배열째 저장).
+        """
+        grid = self.grid
+        return {
+            "version": CHECKPOINT_VERSION,
+            "grid": {"shape": (grid.rows, grid.cols), "version": grid.version,
+                     "cells": np.array(grid.cells) if grid.version else None},
+            "time": self.time,
+            "ticks": self.ticks,
+            "spawn_timer": self.spawn_timer,
+            "rng": (self.rng or random).getstate(),
+            "vehicles": self.vehicles,
+            "occupancy": self.occupancy.checkpoint_state(),
+            "fleet": self.fleet.checkpoint_state() if self.fleet is not None else None,
+            "metrics": self.metrics.checkpoint_state(),
+            "router": self.fields.checkpoint_state() if self.routing == "congestion" else None,
+            "sink": self.sink.checkpoint_state() if self.sink is not None else None,
+            "heatmap": self.heatmap.checkpoint_state() if self.heatmap is not None else None,
+        }
+
+    def restore_state(self, state):
+        if state["version"] != CHECKPOINT_VERSION:
+            raise ValueError(f"checkpoint version {state['version']} != {CHECKPOINT_VERSION}")
+        grid = self.grid
+        saved = state["grid"]
+        if tuple(saved["shape"]) != (grid.rows, grid.cols):
+            raise ValueError(f"checkpoint map shape {saved['shape']} != {(grid.rows, grid.cols)}")
+        if saved["cells"] is not None:
+            grid.set_cells(saved["cells"])
+            grid.layer = None
+        grid.version = saved["version"]
+        if (state["fleet"] is None) != (self.fleet is None):
+            raise ValueError("checkpoint was taken with a different --vectorized setting")
+        if (state["router"] is None) != (self.routing != "congestion"):
+            raise ValueError("checkpoint was taken with a different --routing setting")
+
+        self.time = state["time"]
+        self.ticks = state["ticks"]
+        self.spawn_timer = state["spawn_timer"]
+        (self.rng or random).setstate(state["rng"])
+        self.vehicles = state["vehicles"]
+        self.occupancy.restore_state(state["occupancy"])
+        if self.fleet is not None:
+            self.fleet.restore_state(state["fleet"])
+        self.metrics.restore_state(state["metrics"])
+        if state["router"] is not None:
+            self.fields.restore_state(state["router"])
+        if self.sink is not None and state["sink"] is not None:
+            self.sink.restore_state(state["sink"])
+        if self.heatmap is not None and state["heatmap"] is not None:
+            self.heatmap.restore_state(state["heatmap"])
+
+    def save_checkpoint(self, path):
+        """pickle 로 저장 (임시 파일에 쓴 뒤 교체 → 도중에 죽어도 이전 체크포인트는 남는다)"""
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(self.checkpoint_state(), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def load_checkpoint(self, path):
+        with open(path, "rb") as f:
+            self.restore_state(pickle.load(f))
+
+    def close(self):
+        """남은 도착 기록을 파일에 쓴다 (프로그램 종료 시 호출)"""
+        if self.sink is not None:
+            self.sink.close()
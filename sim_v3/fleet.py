@@ -0,0 +1,165 @@
+import numpy as np
+
+from vehicle_v2 import VehicleV2
+
+
+class Fleet:
+    """
+    차량 전체를 NumPy 배열(structure-of-arrays)로 들고 있는 저장소.
+
+    VehicleV2 를 한 대씩 움직이는 대신 위치/목표/속도/경과시간/zone 을
+    열 단위 배열로 두고 tick 마다 전체를 한 번에 이동시킨다.
+    도착 차량은 마스크로 골라내 배열 앞쪽으로 압축하므로
+    파이썬 리스트를 다시 만들지 않는다.
+
+    zone 은 zones 리스트의 인덱스로 저장한다 (A=0, B=1, C=2).
+    """
+
+    COLUMNS = ("r", "c", "goal", "speed", "elapsed", "origin", "dest")
+
+    def __init__(self, grid, fields, zones, capacity=1024):
+        self.grid = grid
+        self.fields = fields
+        self.zones = list(zones)
+        self.n = 0
+
+        self.r = np.zeros(capacity)
+        self.c = np.zeros(capacity)
+        self.goal = np.zeros(capacity, dtype=np.int64)  # grid.index(gr, gc)
+        self.speed = np.zeros(capacity)
+        self.elapsed = np.zeros(capacity)
+        self.origin = np.zeros(capacity, dtype=np.int8)
+        self.dest = np.zeros(capacity, dtype=np.int8)
+
+        # 그리기용 VehicleV2 뷰 (재사용)
+        self.view_pool = []
+
+        # 셀(덧댄 평면 인덱스)별 진입 횟수 (HeatmapRecorder 를 붙였을 때만 배열)
+        self.entries = None
+
+    def __len__(self):
+        return self.n
+
+    # ----------------------------------------
+    # 배열 관리
+    # ----------------------------------------
+    def grow(self):
+        cap = max(2 * len(self.r), 16)
+        for name in self.COLUMNS:
+            old = getattr(self, name)
+            new = np.zeros(cap, dtype=old.dtype)
+            new[:self.n] = old[:self.n]
+            setattr(self, name, new)
+
+    def checkpoint_state(self):
+        """체크포인트용: 살아 있는 n 대의 열 배열 복사본"""
+        state = {name: getattr(self, name)[:self.n].copy() for name in self.COLUMNS}
+        state["n"] = self.n
+        state["entries"] = None if self.entries is None else self.entries.copy()
+        return state
+
+    def restore_state(self, state):
+        n = state["n"]
+        cap = max(len(self.r), n)
+        for name in self.COLUMNS:
+            col = np.zeros(cap, dtype=getattr(self, name).dtype)
+            col[:n] = state[name]
+            setattr(self, name, col)
+        self.n = n
+        self.entries = None if state["entries"] is None else state["entries"].copy()
+
+    def add(self, start, goal, speed, origin_zone, dest_zone):
+        if self.n == len(self.r):
+            self.grow()
+        i = self.n
+        self.r[i], self.c[i] = start
+        self.goal[i] = self.grid.index(*goal)
+        self.speed[i] = speed
+        self.elapsed[i] = 0.0
+        self.origin[i] = self.zones.index(origin_zone)
+        self.dest[i] = self.zones.index(dest_zone)
+        self.n += 1
+
+    def cells(self):
+        """현재 셀의 덧댄 평면 인덱스 (VehicleV2.cell 과 같은 반올림)"""
+        n = self.n
+        rr = np.rint(self.r[:n]).astype(np.int64)
+        cc = np.rint(self.c[:n]).astype(np.int64)
+        return (rr + 1) * self.grid.width + (cc + 1)
+
+    # ----------------------------------------
+    # 1 tick 진행
+    # ----------------------------------------
+    def step(self, dt):
+        """
+        전체 차량을 dt 만큼 진행.
+        return: 이번 tick 에 도착한 차량의 (origin, dest, elapsed) 배열
+        """
+        n = self.n
+        self.elapsed[:n] += dt
+        cell = self.cells()
+
+        # 도착 체크 → 기록 후 압축
+        arrived = cell == self.goal[:n]
+        done = (self.origin[:n][arrived].copy(),
+                self.dest[:n][arrived].copy(),
+                self.elapsed[:n][arrived].copy())
+        if arrived.any():
+            keep = ~arrived
+            m = int(keep.sum())
+            for name in self.COLUMNS:
+                col = getattr(self, name)
+                col[:m] = col[:n][keep]
+            cell = cell[keep]
+            n = self.n = m
+        if n == 0:
+            return done
+
+        # goal 별 다음 칸 (같은 goal 끼리 묶어서 한 번에 조회)
+        goal = self.goal[:n]
+        nxt = np.full(n, -1, dtype=np.int64)
+        order = np.argsort(goal, kind="stable")
+        uniq, starts = np.unique(goal[order], return_index=True)
+        bounds = list(starts[1:]) + [n]
+        for g, lo, hi in zip(uniq.tolist(), starts.tolist(), bounds):
+            idx = order[lo:hi]
+            hop = self.fields.hop_array(self.grid.coords(g))
+            nxt[idx] = hop[cell[idx]]
+
+        # 다음 칸이 이미 점유됐으면 대기, 같은 칸을 노리는 차량은 앞 순번 1대만
+        occ = np.bincount(cell, minlength=len(self.grid.mask))
+        mover = np.flatnonzero(nxt >= 0)
+        mover = mover[occ[nxt[mover]] == 0]
+        _, first = np.unique(nxt[mover], return_index=True)
+        mover = mover[first]
+
+        # 이동
+        tr, tc = np.divmod(nxt[mover], self.grid.width)
+        dr = (tr - 1) - self.r[mover]
+        dc = (tc - 1) - self.c[mover]
+        dist = np.hypot(dr, dc)
+        ok = dist >= 1e-6
+        mover, dr, dc, dist = mover[ok], dr[ok], dc[ok], dist[ok]
+
+        ratio = np.minimum(self.speed[mover] * dt / dist, 1.0)
+        self.r[mover] += dr * ratio
+        self.c[mover] += dc * ratio
+
+        if self.entries is not None:
+            new = ((np.rint(self.r[mover]).astype(np.int64) + 1) * self.grid.width
+                   + np.rint(self.c[mover]).astype(np.int64) + 1)
+            crossed = new != cell[mover]
+            np.add.at(self.entries, new[crossed], 1)
+        return done
+
+    # ----------------------------------------
+    # 그리기용 뷰
+    # ----------------------------------------
+    def views(self):
+        """현재 차량 위치를 담은 VehicleV2 목록 (그리기 전용, 객체 재사용)"""
+        while len(self.view_pool) < self.n:
+            self.view_pool.append(VehicleV2((0, 0), (0, 0)))
+        views = self.view_pool[:self.n]
+        for v, r, c in zip(views, self.r[:self.n].tolist(), self.c[:self.n].tolist()):
+            v.r, v.c = r, c
+        return views
@@ -1,3 +1,8 @@
+import hashlib
+import os
+import random
+
+import numpy as np
 import pygame
 
 CELL_ROAD = "▧"
@@ -5,44 +10,197 @@ CELL_XING = "▩"
 CELL_BUILD = "▣"
 CELL_EMPTY = "※"
 
+# cells 배열에 저장되는 셀 종류 코드 (uint8)
+CODE_EMPTY = 0
+CODE_ROAD = 1
+CODE_XING = 2
+CODE_BUILD = 3
+
+TILE_CODES = {CELL_ROAD: CODE_ROAD, CELL_XING: CODE_XING, CELL_BUILD: CODE_BUILD}
+
+# 파싱된 셀 배열 캐시 폴더 (맵 파일과 같은 폴더 아래)
+CACHE_DIR = "__cache__"
+
+# 통행 마스크를 만들 때 한 번에 처리하는 셀 수 (큰 맵에서 임시 배열 크기 제한)
+MASK_CHUNK = 1 << 20
+
 COLOR_ROAD = (40, 40, 70)
 COLOR_XING = (120, 120, 170)
 COLOR_BUILD = (30, 30, 30)
 
 
+class CellList:
+    """
+    (r, c) 좌표 목록을 평면 인덱스 배열 하나로 들고 있는 읽기 전용 시퀀스.
+    튜플 리스트(칸당 100바이트 이상) 대신 칸당 8바이트로 zone 도로 좌표를 보관한다.
+    len / 인덱싱 / 순회 / random.choice 는 리스트와 똑같이 동작한다.
+    """
+
+    def __init__(self, flat, cols):
+        self.flat = flat
+        self.cols = cols
+
+    def __len__(self):
+        return len(self.flat)
+
+    def __getitem__(self, i):
+        return divmod(int(self.flat[i]), self.cols)
+
+
 class GridV2:
-    def __init__(self, filename="road_map.txt", cell_size=20):
+    def __init__(self, filename="road_map.txt", cell_size=20, cells=None):
+        """
+        filename: 글리프 텍스트 맵, 또는 convert_map.py 로 변환한 .npy 셀 코드 배열
+                  (.npy 는 메모리 매핑으로 열어 파일 크기만큼만 메모리를 쓴다)
+        cells: 파일 대신 (rows, cols) uint8 셀 코드 배열을 바로 쓸 때 (from_cells 참고)
+        """
         self.cell_size = cell_size
+        self.filename = filename  # 디스크 캐시 위치 기준 (맵 파일 없이 만든 격자는 None)
 
-        self.map = []
+        # cells: (rows, cols) uint8 셀 종류 코드
+        # mask: 테두리 1칸을 덧댄 (rows+2) x (cols+2) 통행 가능 여부 (bytearray)
+        #       → 이웃 조회 시 경계 검사가 필요 없다. passable 은 같은 메모리의 NumPy 뷰.
+        self.cells = None
+        self.mask = None
+        self.passable = None
         self.rows = 0
         self.cols = 0
+        self.width = 2  # 덧댄 행 길이 (cols + 2)
+
+        # 도로 구조가 바뀔 때마다 증가 (경로 캐시 무효화용)
+        self.version = 0
+
+        # 정적 지형 레이어 (version/cell_size 가 바뀔 때만 다시 그림)
+        self.layer = None
+        self.layer_key = None
 
-        self.load(filename)
+        # zone 별 도로 좌표 (version 이 바뀔 때만 다시 계산)
+        self.zone_cache = {}
+        self.zone_cache_version = None
+
+        if cells is not None:
+            self.set_cells(cells)
+        else:
+            self.load(filename)
         self.compute_zones()  # A/B/C zone 고정 생성
 
+    @classmethod
+    def from_cells(cls, cells, cell_size=20):
+        """셀 코드 배열로 바로 만드는 격자 (생성한 맵/벤치마크용, 디스크 캐시 없음)"""
+        return cls(None, cell_size, cells=np.asarray(cells, dtype=np.uint8))
+
     # ----------------------------------------
     # 파일 읽기
     # ----------------------------------------
     def load(self, filename):
+        """
+        글리프 맵을 읽어 셀 코드 배열을 만든다.
+        파싱 결과는 __cache__/<파일명>-<키>.npy 로 저장하고, 키(경로/수정시각/크기 해시)가
+        같으면 다음 실행부터 텍스트를 다시 읽지 않는다.
+
+        .npy 맵과 캐시는 copy-on-write 메모리 매핑(mmap_mode="c")으로 연다.
+        실제로 읽은 페이지만 메모리에 올라오고, set_tile 로 바꾼 칸은 파일에 쓰지 않는다.
+        """
+        if filename.endswith(".npy"):
+            self.set_cells(self.open_cells(filename))
+            return
+
+        cache_path = self.cache_path(filename)
+        try:
+            cells = self.open_cells(cache_path)
+        except (OSError, ValueError):
+            cells = self.parse(filename)
+            try:
+                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                tmp = f"{cache_path}.{os.getpid()}.tmp"
+                with open(tmp, "wb") as f:
+                    np.save(f, cells)
+                os.replace(tmp, cache_path)
+            except OSError:
+                pass  # 쓰기 불가 폴더면 캐시 없이 진행
+
+        self.set_cells(cells)
+
+    @staticmethod
+    def open_cells(path):
+        cells = np.load(path, mmap_mode="c")
+        if cells.ndim != 2 or cells.dtype != np.uint8:
+            raise ValueError(f"{path}: (rows, cols) uint8 셀 코드 배열이 아님")
+        return cells
+
+    @staticmethod
+    def cache_path(filename):
+        path = os.path.abspath(filename)
+        st = os.stat(path)
+        key = hashlib.sha1(f"{path}@{st.st_mtime_ns}:{st.st_size}".encode("utf-8")).hexdigest()[:16]
+        name = os.path.splitext(os.path.basename(path))[0]
+        return os.path.join(os.path.dirname(path), CACHE_DIR, f"{name}-{key}.npy")
+
+    @staticmethod
+    def parse(filename):
         with open(filename, encoding="utf-8") as f:
             lines = [x.rstrip("\n") for x in f if x.strip()]
 
-        self.rows = len(lines)
-        self.cols = max(len(l) for l in lines)
+        rows = len(lines)
+        cols = max(len(l) for l in lines)
+
+        # 전체 맵을 한 문자열로 이어 붙여 코드포인트 배열로 변환 → 글리프별 코드 매핑
+        text = "".join(l.ljust(cols, CELL_EMPTY) for l in lines)
+        glyphs = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+        cells = np.full(rows * cols, CODE_EMPTY, dtype=np.uint8)
+        for tile, code in TILE_CODES.items():
+            cells[glyphs == ord(tile)] = code
+        return cells.reshape(rows, cols)
 
-        for l in lines:
-            row = list(l) + [CELL_EMPTY] * (self.cols - len(l))
-            self.map.append(row)
+    def set_cells(self, cells):
+        """셀 코드 배열을 받아 통행 마스크를 만든다"""
+        self.cells = cells
+        self.rows, self.cols = cells.shape
+        self.width = self.cols + 2
+
+        self.mask = bytearray((self.rows + 2) * self.width)
+        self.passable = np.frombuffer(self.mask, dtype=np.bool_).reshape(self.rows + 2, self.width)
+
+        # 행 블록 단위로 변환 → 임시 배열이 맵 전체 크기가 되지 않는다
+        step = max(1, MASK_CHUNK // max(self.cols, 1))
+        for lo in range(0, self.rows, step):
+            block = cells[lo:lo + step]
+            self.passable[1 + lo:1 + lo + len(block), 1:-1] = (block == CODE_ROAD) | (block == CODE_XING)
+
+    # ----------------------------------------
+    # 덧댄 평면 인덱스 <-> (r, c)
+    # ----------------------------------------
+    def index(self, r, c):
+        return (r + 1) * self.width + (c + 1)
+
+    def coords(self, i):
+        r, c = divmod(i, self.width)
+        return r - 1, c - 1
+
+    def offsets(self):
+        """pathfinding.DIRS 와 같은 순서의 이웃 인덱스 차이 (상, 하, 좌, 우)"""
+        w = self.width
+        return (-w, w, -1, 1)
 
     # ----------------------------------------
     # 도로 판정
     # ----------------------------------------
     def is_road(self, r, c):
         if 0 <= r < self.rows and 0 <= c < self.cols:
-            return self.map[r][c] in (CELL_ROAD, CELL_XING)
+            return self.mask[(r + 1) * self.width + (c + 1)] == 1
         return False
 
+    # ----------------------------------------
+    # 셀 변경 (도로 추가/철거 실험용)
+    # ----------------------------------------
+    def set_tile(self, r, c, tile):
+        code = TILE_CODES.get(tile, CODE_EMPTY)
+        if self.cells[r, c] == code:
+            return
+        self.cells[r, c] = code
+        self.mask[self.index(r, c)] = code in (CODE_ROAD, CODE_XING)
+        self.version += 1
+
     # ----------------------------------------
     # Zone 고정 3분할 (A/B/C)
     # ----------------------------------------
@@ -70,40 +228,61 @@ class GridV2:
                 return name
         return "C"  # fallback
 
+    # ----------------------------------------
+    # zone 안의 도로 좌표 (행 우선 순서)
+    # ----------------------------------------
+    def zone_cells(self, zone):
+        if self.zone_cache_version != self.version:
+            self.zone_cache = {}
+            self.zone_cache_version = self.version
+
+        pts = self.zone_cache.get(zone)
+        if pts is None:
+            lo, hi = self.zone_ranges[zone]
+            road = self.passable[1 + lo:1 + hi, 1:-1]
+            pts = CellList(lo * self.cols + np.flatnonzero(road), self.cols)
+            self.zone_cache[zone] = pts
+        return pts
+
     # ----------------------------------------
     # 스폰 & 골 선택
     # ----------------------------------------
-    def get_spawn_and_goal(self):
+    def get_spawn_and_goal(self, rng=None):
+        """
+        rng: random.Random 인스턴스 (None 이면 전역 random)
+        실험 재현을 위해 작업마다 별도 rng 를 넘길 수 있다.
+        """
+        rng = rng or random
         # 위쪽 도로(A지역)에서 출발
-        A_lo, A_hi = self.zone_ranges["A"]
-        A_candidates = [(r, c) for r in range(A_lo, A_hi)
-                        for c in range(self.cols) if self.is_road(r, c)]
+        A_candidates = self.zone_cells("A")
 
         # 아래쪽 도로(C지역)로 도착
-        C_lo, C_hi = self.zone_ranges["C"]
-        C_candidates = [(r, c) for r in range(C_lo, C_hi)
-                        for c in range(self.cols) if self.is_road(r, c)]
+        C_candidates = self.zone_cells("C")
 
-        import random
         if not A_candidates or not C_candidates:
             return None, None
 
-        return random.choice(A_candidates), random.choice(C_candidates)
+        return rng.choice(A_candidates), rng.choice(C_candidates)
 
     # ----------------------------------------
     # 그리기
     # ----------------------------------------
     def draw(self, screen):
+        key = (self.version, self.cell_size)
+        if self.layer is None or self.layer_key != key:
+            self.layer = self.render_layer()
+            self.layer_key = key
+        screen.blit(self.layer, (0, 0))
+
+    def render_layer(self):
+        """도로/교차로/건물을 오프스크린 Surface 에 한 번만 그린다"""
         cs = self.cell_size
-        for r in range(self.rows):
-            for c in range(self.cols):
-                tile = self.map[r][c]
-                if tile == CELL_ROAD:
-                    color = COLOR_ROAD
-                elif tile == CELL_XING:
-                    color = COLOR_XING
-                elif tile == CELL_BUILD:
-                    color = COLOR_BUILD
-                else:
-                    continue
-                pygame.draw.rect(screen, color, (c * cs, r * cs, cs, cs))
+        layer = pygame.Surface((self.cols * cs, self.rows * cs), pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            layer = layer.convert_alpha()
+
+        colors = {CODE_ROAD: COLOR_ROAD, CODE_XING: COLOR_XING, CODE_BUILD: COLOR_BUILD}
+        for code, color in colors.items():
+            for r, c in np.argwhere(self.cells == code).tolist():
+                pygame.draw.rect(layer, color, (c * cs, r * cs, cs, cs))
+        return layer
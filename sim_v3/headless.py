@@ -0,0 +1,64 @@
+import argparse
+import os
+import random
+import time
+
+from engine import Engine, SIM_DT
+from profiler import PhaseTimer
+from grid_v2 import GridV2
+from heatmap import HeatmapRecorder
+
+
+def main():
+    parser = argparse.ArgumentParser(description="화면 없이 시뮬레이션 실행")
+    parser.add_argument("--map", default="road_map.txt")
+    parser.add_argument("--duration", type=float, default=3600.0, help="시뮬레이션 시간(초)")
+    parser.add_argument("--spawn-interval", type=float, default=1.0)
+    parser.add_argument("--speed", type=float, default=3.0, help="칸/초")
+    parser.add_argument("--dt", type=float, default=SIM_DT)
+    parser.add_argument("--seed", type=int, default=None, help="스폰 난수 시드")
+    parser.add_argument("--vectorized", action="store_true", help="NumPy 배열 기반 차량 저장소 사용")
+    parser.add_argument("--routing", choices=["bfs", "congestion"], default="bfs")
+    parser.add_argument("--refresh-interval", type=float, default=5.0, help="혼잡 비용 갱신 주기(초)")
+    parser.add_argument("--profile", default=None, help="구간별 소요 시간 통계를 저장할 JSON 경로")
+    parser.add_argument("--trip-log", default=None, help="도착 차량 기록을 실행 중에 쓸 gzip CSV 경로")
+    parser.add_argument("--heatmap", default=None, help="셀별 혼잡 히트맵을 저장할 .npz 경로")
+    parser.add_argument("--heatmap-interval", type=float, default=10.0, help="히트맵 프레임 간격(초)")
+    parser.add_argument("--heatmap-buckets", type=int, default=360, help="보관할 최근 프레임 수")
+    parser.add_argument("--checkpoint", default=None, help="실행 상태를 주기적으로 저장할 경로")
+    parser.add_argument("--checkpoint-interval", type=float, default=300.0, help="체크포인트 간격(초)")
+    parser.add_argument("--resume", action="store_true", help="--checkpoint 파일이 있으면 그 시점부터 이어서 실행")
+    args = parser.parse_args()
+
+    grid = GridV2(args.map)
+    heatmap = (HeatmapRecorder.for_grid(grid, args.heatmap_interval, args.heatmap_buckets)
+               if args.heatmap else None)
+    engine = Engine(grid, args.spawn_interval, args.speed, args.dt,
+                    rng=random.Random(args.seed), vectorized=args.vectorized,
+                    routing=args.routing, refresh_interval=args.refresh_interval,
+                    trip_log=args.trip_log, profiler=PhaseTimer(enabled=bool(args.profile)),
+                    heatmap=heatmap)
+
+    if args.resume and args.checkpoint and os.path.exists(args.checkpoint):
+        engine.load_checkpoint(args.checkpoint)
+        print(f"[Info] resumed from {args.checkpoint} at {engine.time:.0f}s")
+
+    start_ticks = engine.ticks
+    t0 = time.perf_counter()
+    result = engine.run(args.duration - engine.time, args.checkpoint, args.checkpoint_interval)
+    engine.close()
+    if args.profile:
+        engine.profiler.dump(args.profile)
+    if heatmap is not None:
+        heatmap.save(args.heatmap)
+    elapsed = time.perf_counter() - t0
+
+    print(f"{args.duration:.0f}s simulated in {elapsed:.2f}s "
+          f"({(engine.ticks - start_ticks) / elapsed:.0f} ticks/s)")
+    for key, data in result.items():
+        print(f"{key}  Avg:{data['avg']:.1f}s  "
+              f"S:{data['shortest']:.0f}  E:{data['weighted']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
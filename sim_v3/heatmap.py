@@ -0,0 +1,100 @@
+import numpy as np
+
+# uint16 프레임: 셀당 차량 수/진입 횟수가 65535 를 넘으면 잘라서 저장
+FRAME_DTYPE = np.uint16
+FRAME_MAX = np.iinfo(FRAME_DTYPE).max
+
+
+class HeatmapRecorder:
+    """
+    셀별 혼잡 기록기 (시간 구간별 NumPy 프레임, 고정 크기 링 버퍼).
+
+    interval 초(시뮬레이션 시간)마다 프레임 1장:
+      occupancy[r, c] : 구간 끝 시점에 그 셀에 있는 차량 수
+      flow[r, c]      : 구간 동안 그 셀로 들어온 차량 수 (셀 경계 통과 횟수)
+
+    버퍼는 buckets 장을 넘으면 가장 오래된 프레임부터 덮어쓰므로
+    며칠을 돌려도 메모리는 buckets x rows x cols x 4 바이트로 고정이다.
+
+    save() 는 np.savez_compressed 로 times/occupancy/flow (오래된 순)와
+    도로 마스크(road)를 함께 저장한다 → heatmap_replay.py 로 재생.
+
+    simul/heatmap.py 는 이 파일을 줄인 사본이다 (두 앱은 모듈을 공유하지 않음).
+    여기를 기준으로 고치고 저장 형식이나 기록 규칙이 바뀌면 그쪽에도 반영한다.
+    """
+
+    def __init__(self, rows, cols, road=None, interval=10.0, buckets=360):
+        self.rows = rows
+        self.cols = cols
+        self.interval = interval
+        self.buckets = buckets
+        self.road = np.ones((rows, cols), dtype=bool) if road is None else np.array(road, dtype=bool)
+
+        self.times = np.zeros(buckets)  # 각 프레임의 구간 끝 시각
+        self.occupancy = np.zeros((buckets, rows, cols), dtype=FRAME_DTYPE)
+        self.flow = np.zeros((buckets, rows, cols), dtype=FRAME_DTYPE)
+        self.head = 0   # 다음에 쓸 칸
+        self.count = 0  # 채워진 프레임 수 (<= buckets)
+        self.next_time = interval
+
+    @classmethod
+    def for_grid(cls, grid, interval=10.0, buckets=360):
+        """GridV2 크기/도로 마스크로 만든다"""
+        return cls(grid.rows, grid.cols, grid.passable[1:-1, 1:-1], interval, buckets)
+
+    def checkpoint_state(self):
+        return {"times": self.times.copy(), "occupancy": self.occupancy.copy(), "flow": self.flow.copy(),
+                "head": self.head, "count": self.count, "next_time": self.next_time}
+
+    def restore_state(self, state):
+        self.times[:] = state["times"]
+        self.occupancy[:] = state["occupancy"]
+        self.flow[:] = state["flow"]
+        self.head = state["head"]
+        self.count = state["count"]
+        self.next_time = state["next_time"]
+
+    def due(self, now):
+        return now + 1e-9 >= self.next_time
+
+    def record(self, now, occupancy, flow):
+        """
+        프레임 1장 추가. occupancy/flow: (rows, cols) 셀별 값 배열.
+        """
+        i = self.head
+        self.times[i] = now
+        np.minimum(occupancy, FRAME_MAX, out=self.occupancy[i], casting="unsafe")
+        np.minimum(flow, FRAME_MAX, out=self.flow[i], casting="unsafe")
+        self.head = (i + 1) % self.buckets
+        self.count = min(self.count + 1, self.buckets)
+        self.next_time += self.interval
+        while self.next_time <= now:  # 긴 공백 뒤에는 밀린 구간을 건너뜀
+            self.next_time += self.interval
+
+    def order(self):
+        """링 버퍼 칸 번호를 오래된 프레임부터"""
+        if self.count < self.buckets:
+            return np.arange(self.count)
+        return (np.arange(self.buckets) + self.head) % self.buckets
+
+    def frames(self):
+        """(times, occupancy, flow) 오래된 순 복사본"""
+        idx = self.order()
+        return self.times[idx], self.occupancy[idx], self.flow[idx]
+
+    def latest(self, layer="occupancy"):
+        """가장 최근 프레임 (없으면 None)"""
+        if not self.count:
+            return None
+        return getattr(self, layer)[(self.head - 1) % self.buckets]
+
+    def save(self, path):
+        times, occupancy, flow = self.frames()
+        np.savez_compressed(path, times=times, occupancy=occupancy, flow=flow,
+                            road=self.road, interval=self.interval)
+
+
+def load_heatmap(path):
+    """save() 로 저장한 파일 → {"times", "occupancy", "flow", "road", "interval"}"""
+    with np.load(path) as f:
+        return {name: f[name] for name in f.files}
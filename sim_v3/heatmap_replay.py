@@ -0,0 +1,83 @@
+import argparse
+
+import numpy as np
+import pygame
+
+from heatmap import load_heatmap
+from ui_overlay import draw_heatmap, draw_profile_box
+
+ROAD_COLOR = (60, 60, 75)
+BUILD_COLOR = (15, 15, 30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="혼잡 히트맵 (HeatmapRecorder.save) 재생")
+    parser.add_argument("path", help="heatmap .npz 경로")
+    parser.add_argument("--cell-size", type=int, default=8)
+    parser.add_argument("--fps", type=float, default=10.0, help="초당 재생 프레임 수")
+    parser.add_argument("--layer", choices=["occupancy", "flow"], default="occupancy")
+    args = parser.parse_args()
+
+    data = load_heatmap(args.path)
+    times = data["times"]
+    if len(times) == 0:
+        print("[Info] no frames recorded")
+        return
+    layers = {"occupancy": data["occupancy"], "flow": data["flow"]}
+    # 색 척도는 전체 기록의 99 퍼센타일로 고정 (프레임마다 색이 튀지 않게)
+    vmax = {name: max(1.0, float(np.percentile(frames[frames > 0], 99))) if frames.any() else 1.0
+            for name, frames in layers.items()}
+
+    road = data["road"]
+    rows, cols = road.shape
+    cs = args.cell_size
+
+    pygame.init()
+    screen = pygame.display.set_mode((cols * cs, rows * cs))
+    pygame.display.set_caption("혼잡 히트맵 재생")
+
+    # 배경: 도로/건물 (1 칸 = 1 픽셀 → 확대)
+    bg = np.where(road[..., None], ROAD_COLOR, BUILD_COLOR).astype(np.uint8)
+    background = pygame.transform.scale(pygame.surfarray.make_surface(bg.swapaxes(0, 1)),
+                                        (cols * cs, rows * cs))
+
+    clock = pygame.time.Clock()
+    layer = args.layer
+    frame = 0
+    playing = True
+    elapsed = 0.0
+
+    # SPACE 재생/정지, ←/→ 한 프레임, L 점유/진입 전환
+    running = True
+    while running:
+        elapsed += clock.tick(60) / 1000.0
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    playing = not playing
+                elif event.key == pygame.K_RIGHT:
+                    frame = (frame + 1) % len(times)
+                elif event.key == pygame.K_LEFT:
+                    frame = (frame - 1) % len(times)
+                elif event.key == pygame.K_l:
+                    layer = "flow" if layer == "occupancy" else "occupancy"
+
+        if playing and elapsed >= 1.0 / args.fps:
+            frame = (frame + 1) % len(times)
+            elapsed = 0.0
+
+        screen.blit(background, (0, 0))
+        draw_heatmap(screen, layers[layer][frame], cs, vmax[layer])
+        draw_profile_box(screen, [
+            f"t={times[frame]:.0f}s  frame {frame + 1}/{len(times)}",
+            f"{layer}  (max color = {vmax[layer]:.0f})",
+        ])
+        pygame.display.flip()
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,14 @@
 import pygame
 
 from grid_v2 import GridV2
-from vehicle_v2 import VehicleV2
-from ui_overlay import draw_metrics_box
-from metrics import MetricsTracker
+from ui_overlay import draw_metrics_box, draw_profile_box, draw_heatmap
+from engine import Engine
+from profiler import PhaseTimer
+from heatmap import HeatmapRecorder
 
 FPS = 60
+MAX_FRAME_TIME = 0.25  # 창 드래그 등으로 프레임이 멈췄을 때 따라잡을 최대 시간
+PROFILE_PATH = "profile.json"  # P 로 켠 프로파일 결과 (종료 시 저장)
 
 
 def main():
@@ -21,63 +24,65 @@ def main():
 
     clock = pygame.time.Clock()
 
-    vehicles = []
-    spawn_timer = 0.0
-    spawn_interval = 1.0  # 초당 1대 정도
-
-    metrics = MetricsTracker(grid)
+    # P 키: 구간별 소요 시간 측정 + HUD 표시 토글
+    profiler = PhaseTimer()
+    # H 키: 최근 10초 구간의 셀별 혼잡(차량 수) 히트맵 표시 토글
+    # (기록기는 처음 누를 때 만든다 → 안 쓰면 프레임 버퍼도, 진입 횟수 집계도 없음)
+    heatmap = None
+    show_heatmap = False
+    engine = Engine(grid, spawn_interval=1.0, profiler=profiler)  # 초당 1대 정도
+    accumulator = 0.0
 
     running = True
     while running:
-        dt = clock.tick(FPS) / 1000.0
+        accumulator += min(clock.tick(FPS) / 1000.0, MAX_FRAME_TIME)
 
         # 이벤트 처리
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_p:
+                profiler.enabled = not profiler.enabled
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_h:
+                show_heatmap = not show_heatmap
+                if heatmap is None:
+                    heatmap = HeatmapRecorder.for_grid(grid, interval=10.0)
+                    engine.attach_heatmap(heatmap)
 
         # ======================
-        # 차량 스폰
+        # 시뮬레이션 진행 (고정 dt)
         # ======================
-        spawn_timer += dt
-        if spawn_timer >= spawn_interval:
-            spawn_timer = 0.0
-            start, goal = grid.get_spawn_and_goal()
-            if start and goal:
-                v = VehicleV2(start, goal)
-                v.origin_zone = grid.zone_of(start[0])  # A/B/C
-                v.dest_zone = grid.zone_of(goal[0])     # A/B/C
-                vehicles.append(v)
-
-        # ======================
-        # 차량 업데이트
-        # ======================
-        alive = []
-        for v in vehicles:
-            v.update(grid, dt, vehicles)
-            if v.arrived:
-                # 도착한 애들만 로그에 기록
-                metrics.log_trip(v.origin_zone, v.dest_zone, v.total_time)
-            else:
-                alive.append(v)
-        vehicles = alive
+        while accumulator >= engine.dt:
+            engine.step()
+            accumulator -= engine.dt
 
         # ======================
         # 그리기
         # ======================
-        screen.fill((15, 15, 30))
-        grid.draw(screen)
+        with profiler.phase("draw"):
+            screen.fill((15, 15, 30))
+            grid.draw(screen)
+
+            frame = heatmap.latest() if show_heatmap and heatmap is not None else None
+            if frame is not None:
+                draw_heatmap(screen, frame, grid.cell_size, vmax=max(1, int(frame.max())))
 
-        # 차량 그리기
-        for v in vehicles:
-            v.draw(screen, grid)
+            # 차량 그리기
+            for v in engine.views():
+                v.draw(screen, grid)
 
         # HUD 표시 (평가 팝업)
-        metric_result = metrics.compute()
+        with profiler.phase("metrics"):
+            metric_result = engine.metrics.compute()
         draw_metrics_box(screen, metric_result, width, height)
+        if profiler.enabled:
+            draw_profile_box(screen, profiler.lines())
 
         pygame.display.flip()
 
+    engine.close()
+    if profiler.phases:
+        profiler.dump(PROFILE_PATH)
     pygame.quit()
 
 
@@ -1,28 +1,214 @@
-from pathfinding import shortest_path
+import hashlib
+import json
+import os
+from collections import deque
+
+import numpy as np
+
+from grid_v2 import CACHE_DIR
+from pathfinding import multi_source_field
+
+
+class P2Quantile:
+    """
+    P² 알고리즘 (Jain & Chlamtac): 값을 저장하지 않고 분위수 p 를 추정한다.
+    마커 5개만 유지하므로 메모리 O(1).
+    """
+
+    def __init__(self, p):
+        self.p = p
+        self.q = []                  # 마커 높이
+        self.n = [0, 1, 2, 3, 4]     # 마커 위치
+        self.want = [0.0, 2 * p, 4 * p, 2 + 2 * p, 4.0]  # 원하는 위치
+        self.step = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+
+    def add(self, x):
+        q, n = self.q, self.n
+
+        # 처음 5개는 그대로 모은다
+        if len(q) < 5:
+            q.append(x)
+            q.sort()
+            return
+
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while not (q[k] <= x < q[k + 1]):
+                k += 1
+
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.want[i] += self.step[i]
+
+        # 가운데 3개 마커 위치 보정
+        for i in (1, 2, 3):
+            d = self.want[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                qp = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+                )
+                if q[i - 1] < qp < q[i + 1]:
+                    q[i] = qp
+                else:
+                    q[i] += d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                n[i] += d
+
+    def value(self):
+        q = self.q
+        if not q:
+            return 0.0
+        if len(q) < 5:
+            return q[int(round(self.p * (len(q) - 1)))]
+        return q[2]
+
+
+class TripStats:
+    """zone 쌍 하나의 통행시간 누적 통계 (count/sum/min/max + 중앙값/90%)"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = 0.0
+        self.max = 0.0
+        self.p50 = P2Quantile(0.5)
+        self.p90 = P2Quantile(0.9)
+
+    def add(self, t):
+        if self.count == 0:
+            self.min = self.max = t
+        else:
+            self.min = min(self.min, t)
+            self.max = max(self.max, t)
+        self.count += 1
+        self.total += t
+        self.p50.add(t)
+        self.p90.add(t)
+
+    @property
+    def avg(self):
+        return self.total / self.count if self.count else 0.0
+
+
+def zone_distances(grid, zones):
+    """
+    zone 간 최단거리 분포.
+
+    출발 zone 의 모든 도로 셀에서 다중 출발점 BFS 를 한 번 돌리고,
+    도착 zone 의 각 도로 셀까지 "가장 가까운 출발 셀에서의 거리" 분포를 구한다.
+    거리는 기존 S 값과 같이 경로 위 칸 수 (이동 횟수 + 1) 이다.
+
+    return: {"A→C": {"min": float, "mean": float, "max": float}, ...}
+            도달 가능한 셀이 없으면 모두 1 (기존 fallback 과 동일)
+    """
+    w = grid.width
+    cells = {}
+    for z in zones:
+        flat = grid.zone_cells(z).flat
+        cells[z] = (flat // grid.cols + 1) * w + (flat % grid.cols + 1)
+
+    table = {}
+    for a in zones:
+        field = np.frombuffer(multi_source_field(grid, cells[a]), dtype=np.int32)
+        for b in zones:
+            if a == b:
+                continue
+            d = field[cells[b]]
+            d = d[d >= 0] + 1
+            if len(d):
+                table[f"{a}→{b}"] = {"min": float(d.min()), "mean": float(d.mean()), "max": float(d.max())}
+            else:
+                table[f"{a}→{b}"] = {"min": 1.0, "mean": 1.0, "max": 1.0}
+    return table
+
+
+def zone_distance_cache_path(grid):
+    """맵 파일 옆 __cache__/<맵>-zones-<셀 배열 + zone 구간 해시>.json (맵 파일이 없으면 None)"""
+    if not grid.filename:
+        return None
+    # memmap 된 셀 배열을 복사하지 않고 그대로 해시 (tobytes() 와 같은 값)
+    h = hashlib.sha1(memoryview(np.ascontiguousarray(grid.cells)).cast("B"))
+    h.update(repr(sorted(grid.zone_ranges.items())).encode("utf-8"))
+    path = os.path.abspath(grid.filename)
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(os.path.dirname(path), CACHE_DIR, f"{name}-zones-{h.hexdigest()[:16]}.json")
+
+
+def load_zone_distances(grid, zones):
+    """zone_distances 를 디스크 캐시에서 읽고, 없으면 계산해서 저장"""
+    path = zone_distance_cache_path(grid)
+    if path is not None:
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    table = zone_distances(grid, zones)
+    if path is not None:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(table, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+    return table
 
 
 class MetricsTracker:
-    def __init__(self, grid):
+    def __init__(self, grid, log_size=1000):
         self.grid = grid
-        # (origin_zone, dest_zone, time_sec)
-        self.travel_log = []
+        # 최근 통행 기록만 유지 (origin_zone, dest_zone, time_sec)
+        # 통계는 stats 에 누적되므로 오래 돌려도 메모리가 늘지 않는다.
+        self.travel_log = deque(maxlen=log_size)
 
         self.zones = ["A", "B", "C"]
+        self.pairs = [(a, b) for a in self.zones for b in self.zones if a != b]
+
+        # zone 쌍별 누적 통계
+        self.stats = {pair: TripStats() for pair in self.pairs}
+
+        # 맵이 바뀔 때만 다시 계산 (grid.version 기준)
+        self.map_version = None
+        self.zone_distances = {}
+        self.shortest = {}
+        self.refresh_map_cache()
 
-        # zone 대표 도로 좌표 저장
-        self.zone_points = {}
-        for z in self.zones:
-            lo, hi = grid.zone_ranges[z]
-            pts = [(r, c) for r in range(lo, hi)
-                   for c in range(grid.cols)
-                   if grid.is_road(r, c)]
-            if not pts:
-                pts = [(lo, 0)]
-            self.zone_points[z] = pts
+    # ------------------------------
+    # 맵 의존 캐시 (zone 간 최단거리 분포)
+    # ------------------------------
+    def refresh_map_cache(self):
+        # 같은 맵(셀 배열)이면 디스크 캐시에서 바로 읽는다
+        self.zone_distances = load_zone_distances(self.grid, self.zones)
+        self.shortest = {key: d["min"] for key, d in self.zone_distances.items()}
+        self.map_version = self.grid.version
+
+    # ------------------------------
+    # 체크포인트 (최근 기록 + 누적 통계, 맵 캐시는 다시 읽는다)
+    # ------------------------------
+    def checkpoint_state(self):
+        return {"travel_log": list(self.travel_log), "stats": self.stats}
+
+    def restore_state(self, state):
+        self.travel_log = deque(state["travel_log"], maxlen=self.travel_log.maxlen)
+        self.stats = state["stats"]
 
     # ------------------------------
     def log_trip(self, origin, dest, time_sec):
         self.travel_log.append((origin, dest, time_sec))
+        st = self.stats.get((origin, dest))
+        if st is not None:
+            st.add(time_sec)
 
     # ------------------------------
     def compute(self):
@@ -31,34 +217,29 @@ class MetricsTracker:
         {
             "A→C": {
                 "avg": float,
-                "shortest": float,
+                "shortest": float,          # zone 간 최소 거리 (칸)
+                "shortest_mean": float,     # 도착 셀별 최단거리 평균
+                "shortest_max": float,
                 "weighted": float,
                 "ratio": float,
-                "normalized": float
+                "normalized": float,
+                "count": int, "min": float, "max": float,
+                "p50": float, "p90": float
             },
             ...
         }
         """
         result = {}
 
-        # 1) 평균 통행 시간
+        # 1) 평균 통행 시간 (누적 통계에서 바로)
         avg_times = {}
-        for a in self.zones:
-            for b in self.zones:
-                if a == b:
-                    continue
-                key = f"{a}→{b}"
-                times = [t for (o, d, t) in self.travel_log if o == a and d == b]
-                avg_times[key] = sum(times) / len(times) if times else 0.0
-
-        # 2) BFS 최단 거리
-        shortest = {}
-        for a in self.zones:
-            for b in self.zones:
-                if a == b:
-                    continue
-                key = f"{a}→{b}"
-                shortest[key] = self.shortest_distance_between_zones(a, b)
+        for a, b in self.pairs:
+            avg_times[f"{a}→{b}"] = self.stats[(a, b)].avg
+
+        # 2) zone 간 최단 거리 (맵이 바뀌었을 때만 재계산)
+        if self.map_version != self.grid.version:
+            self.refresh_map_cache()
+        shortest = self.shortest
 
         # 3) 효율지수: avg / shortest
         weighted = {}
@@ -82,25 +263,22 @@ class MetricsTracker:
             normalized[key] = weighted[key] / max_weight
 
         # 6) 최종 result 구성
-        for key in avg_times:
+        for a, b in self.pairs:
+            key = f"{a}→{b}"
+            st = self.stats[(a, b)]
             result[key] = {
                 "avg": avg_times[key],
                 "shortest": shortest[key],
+                "shortest_mean": self.zone_distances[key]["mean"],
+                "shortest_max": self.zone_distances[key]["max"],
                 "weighted": weighted[key],
                 "ratio": ratio[key],
                 "normalized": normalized[key],
+                "count": st.count,
+                "min": st.min,
+                "max": st.max,
+                "p50": st.p50.value(),
+                "p90": st.p90.value(),
             }
 
         return result
-
-    # ------------------------------
-    # Zone BFS 거리
-    # ------------------------------
-    def shortest_distance_between_zones(self, z1, z2):
-        s1 = self.zone_points[z1][0]
-        s2 = self.zone_points[z2][0]
-
-        path = shortest_path(self.grid, s1, s2)
-        if path:
-            return len(path)
-        return 1
@@ -0,0 +1,55 @@
+import numpy as np
+
+
+class OccupancyIndex:
+    """
+    셀 → 그 셀에 있는 차량 수.
+
+    메인 루프가 스폰/도착 때, 차량이 셀 경계를 넘을 때만 갱신하므로
+    "다음 칸이 비었는지" 확인이 차량 수와 상관없이 O(1) 이다.
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self.entries = None  # 셀 → 진입 횟수 (HeatmapRecorder 를 붙였을 때만 dict)
+
+    def add(self, cell):
+        self.counts[cell] = self.counts.get(cell, 0) + 1
+
+    def remove(self, cell):
+        n = self.counts.get(cell, 0) - 1
+        if n > 0:
+            self.counts[cell] = n
+        else:
+            self.counts.pop(cell, None)
+
+    def move(self, old, new):
+        if old == new:
+            return
+        self.remove(old)
+        self.add(new)
+        if self.entries is not None:
+            self.entries[new] = self.entries.get(new, 0) + 1
+
+    def is_occupied(self, cell):
+        return cell in self.counts
+
+    def count(self, cell):
+        return self.counts.get(cell, 0)
+
+    def checkpoint_state(self):
+        return {"counts": dict(self.counts),
+                "entries": None if self.entries is None else dict(self.entries)}
+
+    def restore_state(self, state):
+        self.counts = dict(state["counts"])
+        self.entries = None if state["entries"] is None else dict(state["entries"])
+
+    def to_array(self, grid, counts=None):
+        """grid.mask 와 같은 길이의 셀별 차량 수 배열 (점유된 셀만 훑는다)"""
+        counts = self.counts if counts is None else counts
+        arr = np.zeros(len(grid.mask))
+        if counts:
+            idx = [grid.index(r, c) for r, c in counts]
+            arr[idx] = list(counts.values())
+        return arr
@@ -1,5 +1,13 @@
+from array import array
 from collections import deque
 
+import numpy as np
+
+DIRS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+
+# 모든 탐색은 grid.mask (테두리 1칸을 덧댄 평면 통행 마스크) 위에서 돈다.
+# 테두리는 항상 통행 불가라서 이웃 인덱스 i + offset 에 경계 검사가 필요 없다.
+
 
 def shortest_path(grid, start, goal):
     """
@@ -13,41 +21,189 @@ def shortest_path(grid, start, goal):
     if not grid.is_road(sr, sc) or not grid.is_road(gr, gc):
         return []
 
-    R, C = grid.rows, grid.cols
-    visited = [[False] * C for _ in range(R)]
-    prev = [[None] * C for _ in range(R)]
+    mask = grid.mask
+    offsets = grid.offsets()
+    s = grid.index(sr, sc)
+    g = grid.index(gr, gc)
 
-    q = deque()
-    q.append((sr, sc))
-    visited[sr][sc] = True
+    prev = array("l", [-1]) * len(mask)
+    prev[s] = s
 
-    dirs = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+    q = deque()
+    q.append(s)
 
     found = False
     while q:
-        r, c = q.popleft()
-        if (r, c) == (gr, gc):
+        i = q.popleft()
+        if i == g:
             found = True
             break
 
-        for dr, dc in dirs:
-            nr, nc = r + dr, c + dc
-            if 0 <= nr < R and 0 <= nc < C:
-                if not visited[nr][nc] and grid.is_road(nr, nc):
-                    visited[nr][nc] = True
-                    prev[nr][nc] = (r, c)
-                    q.append((nr, nc))
+        for o in offsets:
+            j = i + o
+            if prev[j] < 0 and mask[j]:
+                prev[j] = i
+                q.append(j)
 
     if not found:
         return []
 
     # 경로 복원
     path = []
-    cur = (gr, gc)
-    while cur is not None:
-        path.append(cur)
-        r, c = cur
-        cur = prev[r][c]
+    i = g
+    while i != s:
+        path.append(grid.coords(i))
+        i = prev[i]
+    path.append((sr, sc))
 
     path.reverse()
     return path
+
+
+def distance_field(grid, goal):
+    """
+    goal 에서 거꾸로 BFS 를 한 번 돌려 모든 도로 셀의 goal 까지 거리를 구한다.
+    (상하좌우 이동이라 그래프가 무방향 → 역방향 BFS == 정방향 BFS)
+
+    return: grid.mask 와 같은 길이의 int 배열,
+            field[grid.index(r, c)] = 칸 수 (도달 불가 = -1)
+    """
+    mask = grid.mask
+    field = array("i", [-1]) * len(mask)
+
+    gr, gc = goal
+    if not grid.is_road(gr, gc):
+        return field
+
+    offsets = grid.offsets()
+    g = grid.index(gr, gc)
+    field[g] = 0
+    q = deque([g])
+
+    while q:
+        i = q.popleft()
+        d = field[i] + 1
+        for o in offsets:
+            j = i + o
+            if field[j] < 0 and mask[j]:
+                field[j] = d
+                q.append(j)
+
+    return field
+
+
+def multi_source_field(grid, sources):
+    """
+    여러 출발 셀에서 동시에 BFS (다중 출발점 BFS, zone 간 거리용).
+    sources: 덧댄 평면 인덱스 int 배열 (도로 셀만 넘길 것)
+
+    셀 단위 큐 대신 같은 거리의 셀 전체(frontier)를 NumPy 배열로 한 번에 넓히므로
+    zone 셀이 수백만 개여도 셀마다 파이썬 객체를 만들지 않는다.
+    (출발 셀이 하나뿐인 작은 탐색은 distance_field 의 큐 BFS 가 더 빠르다)
+
+    return: grid.mask 와 같은 길이의 int 배열,
+            field[i] = 가장 가까운 출발 셀까지 칸 수 (도달 불가 = -1)
+    """
+    field = array("i", [-1]) * len(grid.mask)
+    f = np.frombuffer(field, dtype=np.int32)
+    passable = np.frombuffer(grid.mask, dtype=np.bool_)
+
+    frontier = np.unique(np.asarray(sources, dtype=np.int64))
+    f[frontier] = 0
+    d = 0
+    while len(frontier):
+        d += 1
+        ahead = []
+        for o in grid.offsets():
+            nb = frontier + o
+            nb = nb[passable[nb] & (f[nb] < 0)]
+            f[nb] = d  # 바로 표시 → 다음 방향에서 같은 셀이 다시 들어오지 않음
+            ahead.append(nb)
+        frontier = np.concatenate(ahead)
+
+    return field
+
+
+def hop_array(field, offsets):
+    """
+    거리장 → 셀별 다음 칸 (덧댄 평면 인덱스, 없으면 -1) 배열.
+    DistanceFields.next_hop 과 같은 규칙(DIRS 순서로 거리 1 감소하는 첫 이웃)을
+    모든 셀에 대해 한 번에 계산한다. Fleet 가 차량 전체를 묶어서 이동시킬 때 사용.
+    """
+    f = np.frombuffer(field, dtype=np.int32)
+    hop = np.full(len(f), -1, dtype=np.int64)
+
+    idx = np.flatnonzero(f > 0)
+    want = f[idx] - 1
+    for o in offsets:
+        ok = (hop[idx] < 0) & (f[idx + o] == want)
+        hop[idx[ok]] = idx[ok] + o
+    return hop
+
+
+class DistanceFields:
+    """
+    goal 셀별 거리장(distance field) 캐시.
+
+    같은 goal 로 가는 차량들은 BFS 결과 하나를 공유하고,
+    각 차량은 주변 4칸의 거리값만 보고 다음 칸을 고른다 (O(1)).
+    grid.version 이 바뀌면 (도로 구조 변경) 캐시 전체를 버린다.
+    """
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.version = grid.version
+        self.fields = {}
+        self.hops = {}
+
+    def check_version(self):
+        if self.version != self.grid.version:
+            self.fields.clear()
+            self.hops.clear()
+            self.version = self.grid.version
+
+    def get(self, goal):
+        self.check_version()
+
+        field = self.fields.get(goal)
+        if field is None:
+            field = distance_field(self.grid, goal)
+            self.fields[goal] = field
+        return field
+
+    def distance(self, cell, goal):
+        """cell → goal 칸 수 (도달 불가 = -1)"""
+        r, c = cell
+        if not (0 <= r < self.grid.rows and 0 <= c < self.grid.cols):
+            return -1
+        return self.get(goal)[self.grid.index(r, c)]
+
+    def next_hop(self, cell, goal):
+        """
+        거리가 1 줄어드는 이웃 칸을 반환.
+        이미 goal 이거나 도달 불가면 None.
+        """
+        field = self.get(goal)
+        grid = self.grid
+        r, c = cell
+        if not (0 <= r < grid.rows and 0 <= c < grid.cols):
+            return None
+
+        i = grid.index(r, c)
+        d = field[i]
+        if d <= 0:
+            return None
+
+        for o in grid.offsets():
+            if field[i + o] == d - 1:
+                return grid.coords(i + o)
+        return None
+
+    def hop_array(self, goal):
+        """goal 로 가는 셀별 다음 칸 배열 (덧댄 평면 인덱스, 없으면 -1)"""
+        field = self.get(goal)  # 버전 확인 포함
+        hop = self.hops.get(goal)
+        if hop is None:
+            hop = hop_array(field, self.grid.offsets())
+            self.hops[goal] = hop
+        return hop
@@ -0,0 +1,94 @@
+import json
+import time
+from collections import deque
+from contextlib import nullcontext
+
+_NULL = nullcontext()  # 꺼져 있을 때 모든 phase 가 공유하는 빈 컨텍스트
+
+
+class _Phase:
+    """phase 하나의 구간 측정기 (같은 이름은 객체 하나를 재사용)"""
+
+    __slots__ = ("samples", "start")
+
+    def __init__(self, window):
+        self.samples = deque(maxlen=window)  # 최근 window 개 소요 시간(초)
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.samples.append(time.perf_counter() - self.start)
+        return False
+
+
+class PhaseTimer:
+    """
+    이름 붙은 구간(spawn/update/metrics/draw ...)별 소요 시간 측정.
+
+        with profiler.phase("update"):
+            ...
+
+    구간마다 최근 window 개 측정값만 보관하고 평균/p50/p90/p99/max 를 계산한다.
+    enabled=False 이면 phase() 가 공유 nullcontext 를 돌려주므로
+    시간 측정도 기록도 하지 않는다 (호출 1번 비용만 남음).
+
+    simul/profiler.py 는 이 파일을 줄인 사본이다 (두 앱은 모듈을 공유하지 않음).
+    여기를 기준으로 고치고 측정/요약 방식이 바뀌면 그쪽에도 반영한다.
+    """
+
+    def __init__(self, enabled=False, window=600):
+        self.enabled = enabled
+        self.window = window
+        self.phases = {}
+
+    def phase(self, name):
+        if not self.enabled:
+            return _NULL
+        p = self.phases.get(name)
+        if p is None:
+            p = self.phases[name] = _Phase(self.window)
+        return p
+
+    def reset(self):
+        self.phases.clear()
+
+    # ----------------------------------------
+    # 통계
+    # ----------------------------------------
+    def summary(self):
+        """
+        return: {phase: {"count", "mean", "p50", "p90", "p99", "max"}}  (ms 단위)
+        """
+        result = {}
+        for name, p in self.phases.items():
+            if not p.samples:
+                continue
+            xs = sorted(p.samples)
+            n = len(xs)
+
+            def pct(q):
+                return xs[min(n - 1, int(q * n))] * 1000.0
+
+            result[name] = {
+                "count": n,
+                "mean": sum(xs) / n * 1000.0,
+                "p50": pct(0.5),
+                "p90": pct(0.9),
+                "p99": pct(0.99),
+                "max": xs[-1] * 1000.0,
+            }
+        return result
+
+    def lines(self):
+        """HUD 표시용 한 줄 요약 목록"""
+        return [
+            f"{name:<8} p50:{s['p50']:.2f}  p90:{s['p90']:.2f}  max:{s['max']:.2f} ms"
+            for name, s in self.summary().items()
+        ]
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2)
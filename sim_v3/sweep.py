@@ -0,0 +1,95 @@
+import argparse
+import csv
+import itertools
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from engine import Engine, SIM_DT
+from grid_v2 import GridV2
+
+COLUMNS = ["map", "routing", "spawn_interval", "speed", "seed", "pair",
+           "count", "avg", "min", "max", "p50", "p90",
+           "shortest", "shortest_mean", "shortest_max", "weighted", "ratio", "normalized", "elapsed"]
+
+
+def make_jobs(maps, spawn_intervals, speeds, seeds, duration, dt=SIM_DT, routings=("bfs",)):
+    """
+    maps × routings × spawn_intervals × speeds × seeds 조합을 작업 목록으로 만든다.
+    같은 seed 를 쓰는 작업들은 같은 스폰 순서를 공유하므로
+    맵끼리 비교할 때 난수 차이가 섞이지 않는다.
+    """
+    return [
+        (os.path.abspath(m), rt, si, sp, seed, duration, dt)
+        for m, rt, si, sp, seed in itertools.product(maps, routings, spawn_intervals, speeds, seeds)
+    ]
+
+
+def run_job(job):
+    """작업 1개 실행 (프로세스 풀에서 호출되므로 모듈 최상위 함수)"""
+    map_path, routing, spawn_interval, speed, seed, duration, dt = job
+
+    grid = GridV2(map_path)
+    engine = Engine(grid, spawn_interval, speed, dt, rng=random.Random(seed), routing=routing)
+
+    t0 = time.perf_counter()
+    result = engine.run(duration)
+    elapsed = time.perf_counter() - t0
+
+    rows = []
+    for pair, data in result.items():
+        row = {
+            "map": os.path.basename(map_path),
+            "routing": routing,
+            "spawn_interval": spawn_interval,
+            "speed": speed,
+            "seed": seed,
+            "pair": pair,
+            "elapsed": round(elapsed, 3),
+        }
+        row.update(data)
+        rows.append(row)
+    return rows
+
+
+def run_sweep(jobs, workers=None):
+    """모든 작업을 코어 수만큼 병렬 실행하고 결과를 한 테이블(list of dict)로 모은다"""
+    table = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for rows in pool.map(run_job, jobs):
+            table.extend(rows)
+    return table
+
+
+def save_table(path, table):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="맵 × 스폰간격 × 속도 × 시드 일괄 실험")
+    parser.add_argument("--maps", nargs="+", default=["road_map.txt"])
+    parser.add_argument("--spawn-intervals", nargs="+", type=float, default=[1.0])
+    parser.add_argument("--speeds", nargs="+", type=float, default=[3.0])
+    parser.add_argument("--seeds", nargs="+", type=int, default=[0, 1, 2])
+    parser.add_argument("--routings", nargs="+", choices=["bfs", "congestion"], default=["bfs"])
+    parser.add_argument("--duration", type=float, default=600.0, help="시뮬레이션 시간(초)")
+    parser.add_argument("--dt", type=float, default=SIM_DT)
+    parser.add_argument("--workers", type=int, default=None, help="기본값: CPU 코어 수")
+    parser.add_argument("--out", default="sweep_results.csv")
+    args = parser.parse_args()
+
+    jobs = make_jobs(args.maps, args.spawn_intervals, args.speeds, args.seeds,
+                     args.duration, args.dt, args.routings)
+
+    t0 = time.perf_counter()
+    table = run_sweep(jobs, args.workers)
+    save_table(args.out, table)
+    print(f"{len(jobs)} jobs in {time.perf_counter() - t0:.1f}s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import csv
+import gzip
+import io
+import os
+
+
+class TripSink:
+    """
+    도착 차량 기록을 gzip CSV 파일로 흘려 쓰는 저장소.
+
+    행은 메모리 버퍼에 모았다가 batch_size 행이 차거나 마지막 기록 후
+    flush_interval 초(시뮬레이션 시간)가 지나면 gzip member 하나로 압축해 파일 끝에 덧붙인다.
+    member 는 각각 완결된 gzip 이라 도중에 프로세스가 죽어도 마지막 flush 까지는
+    그대로 읽을 수 있다 (gzip.open / pandas.read_csv 가 이어진 member 를 한 파일로 읽음).
+    버퍼 크기가 batch_size 로 묶여 있으므로 오래 돌려도 메모리가 늘지 않는다.
+    """
+
+    COLUMNS = ("time", "origin", "dest", "travel_time")
+
+    def __init__(self, path, batch_size=1000, flush_interval=60.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self.rows = []
+        self.last_flush = 0.0
+        self.written = 0
+        # 파일은 첫 flush 때 헤더와 함께 새로 만든다 (같은 경로의 이전 실행 기록은 지움).
+        # 생성자에서 바로 지우지 않는 것은 재개 시 restore_state 가 기존 파일을 이어 써야 하기 때문.
+        self.started = False
+
+    def checkpoint_state(self):
+        """체크포인트용: 아직 안 쓴 버퍼 + 그 시점의 파일 크기"""
+        size = os.path.getsize(self.path) if self.started else 0
+        return {"rows": list(self.rows), "last_flush": self.last_flush,
+                "written": self.written, "size": size}
+
+    def restore_state(self, state):
+        """체크포인트 이후에 덧붙은 member 는 잘라낸다 (재개 후 같은 기록이 다시 쓰이므로)"""
+        # size 0 = 체크포인트 때 아직 파일을 만들기 전 → 첫 flush 가 새로 만든다
+        self.started = state["size"] > 0
+        if self.started:
+            with open(self.path, "ab") as f:
+                f.truncate(state["size"])
+        self.rows = list(state["rows"])
+        self.last_flush = state["last_flush"]
+        self.written = state["written"]
+
+    def add(self, now, origin, dest, travel_time):
+        self.rows.append((now, origin, dest, travel_time))
+
+    def extend(self, now, origins, dests, travel_times):
+        self.rows.extend((now, o, d, t) for o, d, t in zip(origins, dests, travel_times))
+
+    def poll(self, now):
+        """tick 마다 호출: 버퍼가 찼거나 flush_interval 이 지났으면 기록"""
+        if len(self.rows) >= self.batch_size or (
+                self.rows and now - self.last_flush >= self.flush_interval):
+            self.flush(now)
+
+    def flush(self, now=None):
+        if now is not None:
+            self.last_flush = now
+        if not self.started:
+            self.write_member([self.COLUMNS], "wb")
+            self.started = True
+        if not self.rows:
+            return
+        self.write_member(self.rows)
+        self.written += len(self.rows)
+        self.rows = []
+
+    def write_member(self, rows, mode="ab"):
+        buf = io.StringIO()
+        csv.writer(buf).writerows(rows)
+        with open(self.path, mode) as f:
+            f.write(gzip.compress(buf.getvalue().encode("utf-8")))
+
+    def close(self):
+        self.flush()
+
+
+def read_trips(path):
+    """TripSink 파일을 행 단위로 읽기 (헤더 제외, 값은 문자열)"""
+    with gzip.open(path, "rt", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        yield from reader
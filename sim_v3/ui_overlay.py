@@ -1,3 +1,4 @@
+import numpy as np
 import pygame
 
 
@@ -46,3 +47,51 @@ def draw_metrics_box(screen, metrics, screen_w, screen_h):
         y += 25  # 줄 간격 넓게해서 절대 안 겹치도록 설정
 
     screen.blit(surface, rect)
+
+
+def draw_profile_box(screen, lines, x=10, y=10):
+    """
+    구간별 소요 시간 (PhaseTimer.lines()) 을 화면 좌상단에 표시
+    """
+    if not lines:
+        return
+
+    font = pygame.font.SysFont("consolas", 14)
+    line_h = 18
+    width = max(font.size(line)[0] for line in lines) + 16
+    height = line_h * len(lines) + 10
+
+    surface = pygame.Surface((width, height), pygame.SRCALPHA)
+    surface.fill((0, 0, 0, 180))
+    for i, line in enumerate(lines):
+        img = font.render(line, True, (180, 255, 180))
+        surface.blit(img, (8, 5 + i * line_h))
+
+    screen.blit(surface, (x, y))
+
+
+def heat_colors(values, vmax):
+    """
+    셀 값 → RGBA (rows, cols, 4) uint8 : 0 은 투명, 나머지는 노랑 → 빨강.
+    """
+    t = np.clip(values / max(vmax, 1e-9), 0.0, 1.0)
+    rgba = np.zeros(values.shape + (4,), dtype=np.uint8)
+    rgba[..., 0] = 255
+    rgba[..., 1] = (220 * (1.0 - t)).astype(np.uint8)
+    rgba[..., 2] = 40
+    rgba[..., 3] = np.where(values > 0, 90 + 150 * t, 0).astype(np.uint8)
+    return rgba
+
+
+def draw_heatmap(screen, values, cell_size, vmax, x=0, y=0):
+    """
+    (rows, cols) 셀 값 배열 1장을 반투명 히트맵으로 덮어 그린다.
+    한 칸 = 1 픽셀 surface 를 만든 뒤 cell_size 배로 확대 (셀마다 rect 를 그리지 않음).
+    """
+    rgba = heat_colors(values, vmax)
+    rows, cols = values.shape
+    surface = pygame.Surface((cols, rows), pygame.SRCALPHA)
+    pygame.surfarray.pixels3d(surface)[...] = rgba[..., :3].swapaxes(0, 1)
+    pygame.surfarray.pixels_alpha(surface)[...] = rgba[..., 3].swapaxes(0, 1)
+    surface = pygame.transform.scale(surface, (cols * cell_size, rows * cell_size))
+    screen.blit(surface, (x, y))
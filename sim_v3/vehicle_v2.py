@@ -1,29 +1,35 @@
 import pygame
 
-from pathfinding import shortest_path
-
 CAR_COLOR = (20, 130, 255)
 
 
 class VehicleV2:
+    # __dict__ 없이 고정 슬롯만 → 객체당 메모리 절약, 속성 접근도 빠름
+    __slots__ = ("start", "goal", "r", "c", "arrived", "speed", "total_time",
+                 "origin_zone", "dest_zone")
+
     def __init__(self, start, goal, speed_cells_per_sec=3.0):
+        self.reset(start, goal, speed_cells_per_sec)
+
+    def reset(self, start, goal, speed_cells_per_sec=3.0):
+        """새 차량 상태로 초기화 (VehiclePool 재사용 시에도 호출)"""
         self.start = start
         self.goal = goal
         self.r, self.c = float(start[0]), float(start[1])
-        self.path = []
         self.arrived = False
         self.speed = speed_cells_per_sec
         self.total_time = 0.0
 
-        # 나중에 main에서 채움 (A/B/C)
+        # 나중에 engine 에서 채움 (A/B/C)
         self.origin_zone = None
         self.dest_zone = None
+        return self
 
     @property
     def cell(self):
         return int(round(self.r)), int(round(self.c))
 
-    def update(self, grid, dt, vehicles):
+    def update(self, grid, dt, occupancy, fields):
         if self.arrived:
             return
 
@@ -36,20 +42,17 @@ class VehicleV2:
             return
 
         # ---------------------
-        # 매 tick BFS 재탐색
+        # 매 tick 다음 칸 선택 (goal 별 거리장 공유)
         # ---------------------
-        self.path = shortest_path(grid, curr, self.goal)
-        if not self.path or len(self.path) < 2:
+        nxt = fields.next_hop(curr, self.goal)
+        if nxt is None:
             return
 
-        nr, nc = self.path[1]
+        nr, nc = nxt
 
         # 다음 칸을 이미 다른 차량이 점유하면 대기
-        for v in vehicles:
-            if v is self:
-                continue
-            if v.cell == (nr, nc):
-                return
+        if occupancy.is_occupied((nr, nc)):
+            return
 
         # 이동
         dist = ((nr - self.r) ** 2 + (nc - self.c) ** 2) ** 0.5
@@ -61,9 +64,30 @@ class VehicleV2:
         self.r += (nr - self.r) * ratio
         self.c += (nc - self.c) * ratio
 
+        # 셀 경계를 넘었으면 점유 인덱스 갱신
+        occupancy.move(curr, self.cell)
+
     def draw(self, screen, grid):
         cs = grid.cell_size
         x = int(self.c * cs + cs / 2)
         y = int(self.r * cs + cs / 2)
 
         pygame.draw.circle(screen, CAR_COLOR, (x, y), cs // 3)
+
+
+class VehiclePool:
+    """
+    도착한 VehicleV2 를 버리지 않고 free-list 에 모아 두었다가 다음 스폰에 재사용.
+    오래 도는 실행에서 차량 객체 생성/해제(GC 부담)를 없앤다.
+    """
+
+    def __init__(self):
+        self.free = []
+
+    def acquire(self, start, goal, speed_cells_per_sec=3.0):
+        if self.free:
+            return self.free.pop().reset(start, goal, speed_cells_per_sec)
+        return VehicleV2(start, goal, speed_cells_per_sec)
+
+    def release(self, v):
+        self.free.append(v)
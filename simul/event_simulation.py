@@ -0,0 +1,116 @@
+import heapq
+from simulation import Simulation
+from vehicle import MOVED, WAIT_SIGNAL, WAIT_GRID
+
+class EventSimulation(Simulation):
+    # Discrete-event version of Simulation.
+    # Vehicles are scheduled in a heap of (tick, seq, vehicle) "vehicle moves" events.
+    # A vehicle that cannot move is parked instead of being rescheduled:
+    #   WAIT_SIGNAL -> woken by the next signal change event (signal_map.next_change_time())
+    #   WAIT_GRID   -> woken when grid.version changes (closed cell opened/closed)
+    # Parked vehicles cost nothing per tick, and when nothing is scheduled the
+    # clock jumps straight to the next signal change.
+    # Movement rules are Vehicle.move itself and the clock is advanced tick by tick
+    # with the same float accumulation, so results match Simulation exactly.
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.tick = 0
+        self.events = []
+        self.seq = 0
+        self.signal_waiters = []
+        self.grid_waiters = []
+        self.grid_version = self.grid.version
+        self.remaining = len(self.vehicles)
+        for v in self.vehicles:
+            self.schedule(v, 0)
+
+    def schedule(self, v, tick):
+        heapq.heappush(self.events, (tick, self.seq, v))
+        self.seq += 1
+
+    def wake(self, waiters):
+        for v in waiters:
+            self.schedule(v, self.tick)
+        waiters.clear()
+
+    def update(self):
+        if self.finished:
+            return
+        t = self.sim_time
+        # 도로 구조 변경 → 막혀 있던 차량 전부 재평가 (경로도 바뀔 수 있음)
+        if self.grid.version != self.grid_version:
+            self.grid_version = self.grid.version
+            self.wake(self.grid_waiters)
+            self.wake(self.signal_waiters)
+        # 신호 변경 이벤트
+        if int(t) >= self.signal_map.next_change_time():
+            self.signal_map.advance(t)
+            self.wake(self.signal_waiters)
+        # 이번 tick 에 움직일 차량
+        with self.profiler.phase("update"):
+            events = self.events
+            while events and events[0][0] <= self.tick:
+                _, _, v = heapq.heappop(events)
+                status = v.move(self.grid, self.signal_map, self.vehicles, t, self.dt)
+                if status == MOVED:
+                    self.schedule(v, self.tick + 1)
+                elif status == WAIT_SIGNAL:
+                    self.signal_waiters.append(v)
+                elif status == WAIT_GRID:
+                    self.grid_waiters.append(v)
+                else:
+                    self.remaining -= 1
+                    self.on_arrive(v)
+        if self.trip_log:
+            self.trip_log.poll(t)
+        self.sim_time += self.dt
+        self.tick += 1
+        self.record_heatmap()
+        self.publish_stats()
+        if self.vehicles and self.remaining == 0:
+            self.stop()
+
+    def checkpoint_state(self):
+        state = super().checkpoint_state()
+        # same pickle as the vehicles, so heap / waiter entries keep pointing at them
+        state["events"] = {
+            "tick": self.tick, "heap": self.events, "seq": self.seq,
+            "signal_waiters": self.signal_waiters, "grid_waiters": self.grid_waiters,
+            "grid_version": self.grid_version, "remaining": self.remaining,
+        }
+        return state
+
+    def restore_state(self, state):
+        super().restore_state(state)
+        ev = state["events"]
+        self.tick = ev["tick"]
+        self.events = ev["heap"]
+        self.seq = ev["seq"]
+        self.signal_waiters = ev["signal_waiters"]
+        self.grid_waiters = ev["grid_waiters"]
+        self.grid_version = ev["grid_version"]
+        self.remaining = ev["remaining"]
+
+    def idle(self):
+        # 예약된 차량 이벤트가 없으면 신호 변경 전까지 할 일이 없다
+        return not self.events and self.grid.version == self.grid_version
+
+    def run(self, max_time=3600.0, checkpoint=None, checkpoint_interval=300.0):
+        next_checkpoint = self.next_checkpoint_time(checkpoint_interval)
+        while not self.finished and self.sim_time < max_time:
+            if self.idle():
+                # 다음 신호 변경까지 시계만 진행 (Simulation 과 같은 누적 방식)
+                change = self.signal_map.next_change_time()
+                dt = self.dt
+                while self.sim_time < max_time and int(self.sim_time) < change:
+                    self.sim_time += dt
+                    self.tick += 1
+                    self.record_heatmap()  # nothing moves, but frames stay on schedule
+                if self.sim_time >= max_time:
+                    break
+            self.update()
+            if checkpoint and self.sim_time >= next_checkpoint:
+                self.save_checkpoint(checkpoint)
+                next_checkpoint = self.next_checkpoint_time(checkpoint_interval)
+        self.stop()
+        return self.results
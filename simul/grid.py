@@ -1,6 +1,9 @@
-import os
 import pygame
 import math
+import numpy as np
+from collections import OrderedDict
+
+from scenario import load_scenario, CODE_ROAD, CODE_XING, CODE_BUILD
 
 ARROW_COLOR = (60, 60, 200)
 
@@ -32,197 +35,144 @@ class Grid:
         self.build_color = (180, 140, 80)
         self.round_color = (160, 160, 210)
 
-        # load files (each loader is robust to missing files)
-        self.map, self.rows, self.cols = self.load_map(road_map_path)
-        self.capacity = self.load_capacity(capacity_map_path)
-        self.lane_count = self.load_lane_count(capacity_map_path)
-        self.lane_change_rule = self.load_lane_change(lane_change_path)
-        self.turn_rule = self.load_turn_rule(turn_rule_path)
-        self.speed_limit = self.load_speed_limit(speed_limit_path)
-        self.closed_cells = self.load_closed_cells(closed_cells_path)
-        self.stop_line = self.load_stop_line(stop_line_path)
-
-    def load_map(self, path):
-        grid = []
-        if not os.path.exists(path):
-            print(f"[Warning] road map file not found: {path}. Using empty map.")
-            return [], 0, 0
-        with open(path, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith("#"):
-                    continue
-                grid.append(list(line))
-        rows = len(grid)
-        cols = max(len(row) for row in grid) if rows > 0 else 0
-        grid = grid[::-1]
-        return grid, rows, cols
-
-    def load_capacity(self, path):
-        cap = {}
-        if not os.path.exists(path):
-            print(f"[Warning] capacity file not found: {path}. Using default capacities.")
-            return cap
-        with open(path, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith("#"):
-                    continue
-                parts = [p.strip() for p in line.split(",")]
-                if len(parts) < 3:
-                    continue
-                try:
-                    r, c, val = map(int, parts[:3])
-                except ValueError:
-                    continue
-                cap[(r, c)] = val
-        return cap
-
-    def load_lane_count(self, path):
-        lane_count = {}
-        if not os.path.exists(path):
-            return lane_count
-        with open(path, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith("#"):
-                    continue
-                parts = [p.strip() for p in line.split(",")]
-                if len(parts) < 3:
-                    continue
-                try:
-                    r, c, lane = map(int, parts[:3])
-                except ValueError:
-                    continue
-                lane_count[(r, c)] = lane
-        return lane_count
-
-    def load_lane_change(self, path):
-        rule = {}
-        if not os.path.exists(path):
-            return rule
-        with open(path, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith("#"):
-                    continue
-                parts = [p.strip() for p in line.split(",")]
-                if len(parts) < 3:
-                    continue
-                try:
-                    r, c, allow = map(int, parts[:3])
-                except ValueError:
-                    continue
-                rule[(r, c)] = bool(allow)
-        return rule
-
-    def load_turn_rule(self, path):
-        rule = {}
-        if not os.path.exists(path):
-            return rule
-        with open(path, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith("#"):
-                    continue
-                parts = [p.strip() for p in line.split(",")]
-                if len(parts) < 4:
-                    continue
-                r, c, dir = parts[0], parts[1], parts[2]
-                lanes = parts[3:]
-                try:
-                    rr, cc = int(r), int(c)
-                    lanes_int = [int(x) for x in lanes if x != ""]
-                except ValueError:
-                    continue
-                rule.setdefault((rr, cc), {}).setdefault(dir, []).extend(lanes_int)
-        return rule
-
-    def load_speed_limit(self, path):
-        limit = {}
-        if not os.path.exists(path):
-            return limit
-        with open(path, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith("#"):
-                    continue
-                parts = [p.strip() for p in line.split(",")]
-                if len(parts) < 4:
-                    continue
-                try:
-                    r, c, l, s = map(int, parts[:4])
-                except ValueError:
-                    continue
-                limit[(r, c, l)] = s
-        return limit
-
-    def load_closed_cells(self, path):
-        closed = set()
-        # debug print to help trace path issues
-        try:
-            print(f"[DEBUG] load_closed_cells called. path={path}, exists={os.path.exists(path)}, abspath={os.path.abspath(path)}")
-        except Exception:
-            pass
-        if not os.path.exists(path):
-            print(f"[Info] closed_cells file not found: {path}. Continuing with no closed cells.")
-            return closed
-        with open(path, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith("#"):
-                    continue
-                parts = [p.strip() for p in line.split(",")]
-                try:
-                    coords = tuple(map(int, parts[:2]))
-                except ValueError:
-                    continue
-                closed.add(coords)
-        return closed
-
-    def load_stop_line(self, path):
-        stop = set()
-        if not os.path.exists(path):
-            return stop
-        with open(path, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith("#"):
-                    continue
-                parts = [p.strip() for p in line.split(",")]
-                try:
-                    coords = tuple(map(int, parts[:2]))
-                except ValueError:
-                    continue
-                stop.add(coords)
-        return stop
+        # all layers are parsed once by scenario.load_scenario (missing files are
+        # treated as empty) and cached as .npz under data/__cache__/.
+        layers = load_scenario({
+            "road_map": road_map_path,
+            "capacity": capacity_map_path,
+            "lane_change": lane_change_path,
+            "turn_rule": turn_rule_path,
+            "speed_limit": speed_limit_path,
+            "closed": closed_cells_path,
+            "stop_line": stop_line_path,
+        })
+        # cells: (rows, cols) uint8 cell codes; mask: passability padded with a
+        # 1-cell border (bytearray) so neighbor probes need no bounds checks.
+        # passable is a NumPy view over the same memory.
+        self.set_cells(layers["cells"])
+        self.capacity = {(r, c): v for r, c, v in layers["capacity"].tolist()}
+        self.lane_count = dict(self.capacity)
+        self.lane_change_rule = {(r, c): bool(allow) for r, c, allow in layers["lane_change"].tolist()}
+        self.turn_rule = {}
+        for (r, c), d, lane in zip(layers["turn_rc"].tolist(), layers["turn_dir"].tolist(), layers["turn_lane"].tolist()):
+            lanes = self.turn_rule.setdefault((r, c), {}).setdefault(d, [])
+            if lane >= 0:
+                lanes.append(lane)
+        self.speed_limit = {(r, c, l): v for r, c, l, v in layers["speed_limit"].tolist()}
+        self.closed_cells = {(r, c) for r, c in layers["closed"].tolist()}
+        self.stop_line = {(r, c) for r, c in layers["stop_line"].tolist()}
+
+        # bumped whenever the road layout changes (closed cells, ...)
+        self.version = 0
+        # per-(speed, lane) routing costs, see utils.cell_costs
+        self.cost_cache = {}
+        self.cost_cache_version = None
+        # per-(goal, speed, lane) time-to-goal trees shared by all vehicles (LRU),
+        # see utils.goal_tree
+        self.route_cache = OrderedDict()
+        self.route_cache_version = None
+        # pre-rendered static terrain, rebuilt when (version, cell_size) changes
+        self.layer = None
+        self.layer_key = None
+        # live occupancy, kept up to date by Vehicle.move (see enter_cell/leave_cell)
+        self.reset_occupancy()
+
+    def set_cells(self, cells):
+        self.cells = cells
+        self.rows, self.cols = cells.shape
+        self.width = self.cols + 2
+        self.mask = bytearray((self.rows + 2) * self.width)
+        self.passable = np.frombuffer(self.mask, dtype=np.bool_).reshape(self.rows + 2, self.width)
+        self.passable[1:-1, 1:-1] = (cells == CODE_ROAD) | (cells == CODE_XING)
+
+    # padded flat index <-> (r, c)
+    def index(self, r, c):
+        return (r + 1) * self.width + (c + 1)
+
+    def coords(self, i):
+        r, c = divmod(i, self.width)
+        return r - 1, c - 1
+
+    def offsets(self):
+        # up, down, left, right (same order as the old BFS)
+        w = self.width
+        return (-w, w, -1, 1)
+
+    def is_road(self, r, c):
+        if 0 <= r < self.rows and 0 <= c < self.cols:
+            return self.mask[(r + 1) * self.width + (c + 1)] == 1
+        return False
+
+    def approach_cells(self, rc, depth=2, blocked=()):
+        # road cells within `depth` steps upstream of stop-line cell rc, where vehicles
+        # queue while check_rules holds them on red. The walk never enters
+        # intersections, other stop lines or `blocked` cells (the signal blocks).
+        seen = {rc}
+        frontier = [rc]
+        for _ in range(depth):
+            ahead = []
+            for r, c in frontier:
+                for nb in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+                    if nb in seen or nb in blocked or nb in self.stop_line or not self.is_road(*nb):
+                        continue
+                    if self.cells[nb] == CODE_XING:
+                        continue
+                    seen.add(nb)
+                    ahead.append(nb)
+            frontier = ahead
+        seen.discard(rc)
+        return seen
+
+    def set_closed(self, rc, closed=True):
+        if closed == (rc in self.closed_cells):
+            return
+        if closed:
+            self.closed_cells.add(rc)
+        else:
+            self.closed_cells.discard(rc)
+        self.version += 1
 
     def draw(self, screen, signals, vehicles):
+        key = (self.version, self.cell_size)
+        if self.layer is None or self.layer_key != key:
+            self.layer = self.render_layer()
+            self.layer_key = key
+        screen.blit(self.layer, (0, 0))
+        # only signals change per frame
+        for (r, c), color in signals.items():
+            if not (0 <= r < self.rows and 0 <= c < self.cols):
+                continue
+            x, y = c * self.cell_size, r * self.cell_size
+            col = {'red': (240, 60, 60), 'green': (80, 220, 80), 'yellow': (240, 220, 60)}.get(color, (220, 220, 220))
+            pygame.draw.circle(screen, col, (x + self.cell_size // 2, y + self.cell_size // 2), 14)
+
+    def render_layer(self):
+        # static terrain: cells, lane stripes, closed cells and stop lines
+        layer = pygame.Surface((self.cols * self.cell_size, self.rows * self.cell_size), pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            layer = layer.convert_alpha()
         for r in range(self.rows):
             for c in range(self.cols):
                 x, y = c * self.cell_size, r * self.cell_size
-                cell = self.map[r][c] if r < len(self.map) and c < len(self.map[r]) else 'B'
+                cell = self.cells[r, c]
                 rect = pygame.Rect(x, y, self.cell_size, self.cell_size)
-                if cell == 'B':
-                    pygame.draw.rect(screen, self.build_color, rect)
-                elif cell == 'R':
+                if cell == CODE_BUILD:
+                    pygame.draw.rect(layer, self.build_color, rect)
+                elif cell == CODE_ROAD:
                     lanes = self.lane_count.get((r, c), 1)
                     lane_width = max(1, self.cell_size // lanes)
                     for l in range(lanes):
                         lane_rect = pygame.Rect(x + l * lane_width, y, lane_width - 2, self.cell_size)
-                        pygame.draw.rect(screen, self.road_color, lane_rect)
-                        pygame.draw.line(screen, (180, 180, 180), (x + l * lane_width, y), (x + l * lane_width, y + self.cell_size), 1)
+                        pygame.draw.rect(layer, self.road_color, lane_rect)
+                        pygame.draw.line(layer, (180, 180, 180), (x + l * lane_width, y), (x + l * lane_width, y + self.cell_size), 1)
                     if (r, c) in self.closed_cells:
-                        pygame.draw.rect(screen, (180, 30, 30), rect, 0)
-                elif cell == 'C':
-                    pygame.draw.rect(screen, self.round_color, rect)
-                    pygame.draw.rect(screen, (120, 120, 200), rect, 3)
-                if (r, c) in signals:
-                    color = signals[(r, c)]
-                    col = {'red': (240, 60, 60), 'green': (80, 220, 80), 'yellow': (240, 220, 60)}.get(color, (220, 220, 220))
-                    pygame.draw.circle(screen, col, (x + self.cell_size // 2, y + self.cell_size // 2), 14)
+                        pygame.draw.rect(layer, (180, 30, 30), rect, 0)
+                elif cell == CODE_XING:
+                    pygame.draw.rect(layer, self.round_color, rect)
+                    pygame.draw.rect(layer, (120, 120, 200), rect, 3)
                 if (r, c) in self.stop_line:
-                    pygame.draw.line(screen, (20, 20, 20), (x, y + 2), (x + self.cell_size, y + 2), 4)
+                    pygame.draw.line(layer, (20, 20, 20), (x, y + 2), (x + self.cell_size, y + 2), 4)
+        return layer
 
     def draw_background(self, screen):
         for i in range(self.cols + 1):
@@ -232,17 +182,79 @@ class Grid:
             y = j * self.cell_size
             pygame.draw.line(screen, (100, 100, 130), (0, y), (self.cols * self.cell_size, y), 3)
 
-    def get_average_congestion(self, vehicles):
-        cell_count = {}
-        for v in vehicles:
-            if v.arrived:
-                continue
-            rc = (int(v.y), int(v.x))
-            cell_count[rc] = cell_count.get(rc, 0) + 1
-        ratios = []
-        for rc, cnt in cell_count.items():
-            cap = self.capacity.get(rc, 1)
-            if cap <= 0:
-                continue
-            ratios.append(cnt / cap)
-        return sum(ratios) / len(ratios) if ratios else 0
\ No newline at end of file
+    # ---- occupancy / congestion ----
+    # occupancy[rc] = vehicles (not yet arrived) on rc; congested_cells counts occupied
+    # cells with capacity > 0 and ratio_sum is the sum of their occupancy/capacity,
+    # so the average congestion never needs a pass over the vehicles.
+    def reset_occupancy(self):
+        self.occupancy = {}
+        self.congested_cells = 0
+        self.ratio_sum = 0.0
+        self.entries = None  # rc -> entries since the last heatmap frame (dict while recording)
+
+    def enter_cell(self, rc):
+        cnt = self.occupancy.get(rc, 0) + 1
+        self.occupancy[rc] = cnt
+        if self.entries is not None:
+            self.entries[rc] = self.entries.get(rc, 0) + 1
+        cap = self.capacity.get(rc, 1)
+        if cap > 0:
+            self.ratio_sum += 1 / cap
+            if cnt == 1:
+                self.congested_cells += 1
+
+    def leave_cell(self, rc):
+        cnt = self.occupancy[rc] - 1
+        if cnt:
+            self.occupancy[rc] = cnt
+        else:
+            del self.occupancy[rc]
+        cap = self.capacity.get(rc, 1)
+        if cap > 0:
+            self.ratio_sum -= 1 / cap
+            if not cnt:
+                self.congested_cells -= 1
+                if not self.congested_cells:
+                    self.ratio_sum = 0.0  # drop accumulated float error
+
+    def checkpoint_state(self):
+        # dynamic part only (checkpoints): closed cells + occupancy counters
+        return {"closed_cells": set(self.closed_cells), "version": self.version,
+                "occupancy": dict(self.occupancy), "congested_cells": self.congested_cells,
+                "ratio_sum": self.ratio_sum,
+                "entries": None if self.entries is None else dict(self.entries)}
+
+    def restore_state(self, state):
+        self.closed_cells = set(state["closed_cells"])
+        self.version = state["version"]
+        self.occupancy = dict(state["occupancy"])
+        self.congested_cells = state["congested_cells"]
+        self.ratio_sum = state["ratio_sum"]
+        self.entries = None if state["entries"] is None else dict(state["entries"])
+        # routing costs / terrain layer are rebuilt for the restored layout
+        self.cost_cache = {}
+        self.cost_cache_version = None
+        self.route_cache.clear()
+        self.route_cache_version = None
+        self.layer = None
+
+    def cell_congestion(self, rc):
+        # occupancy / capacity of one cell (0 if empty or capacity <= 0)
+        cap = self.capacity.get(rc, 1)
+        return self.occupancy.get(rc, 0) / cap if cap > 0 else 0
+
+    def congestion_map(self):
+        # {rc: occupancy / capacity} for occupied cells (heatmaps, routing)
+        return {rc: self.cell_congestion(rc) for rc in self.occupancy}
+
+    def cell_array(self, counts):
+        # {rc: n} -> (rows, cols) array (heatmap frames)
+        arr = np.zeros((self.rows, self.cols))
+        for (r, c), n in counts.items():
+            if 0 <= r < self.rows and 0 <= c < self.cols:
+                arr[r, c] = n
+        return arr
+
+    def get_average_congestion(self):
+        # mean occupancy/capacity over occupied cells, O(1)
+        return self.ratio_sum / self.congested_cells if self.congested_cells else 0
\ No newline at end of file
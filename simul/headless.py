@@ -0,0 +1,45 @@
+import argparse
+import os
+import time
+from simulation import Simulation
+from event_simulation import EventSimulation
+from utils import save_csv
+from vehicle import FRAME_DT
+from profiler import PhaseTimer
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the simulation without a display")
+    parser.add_argument("--max-time", type=float, default=3600.0, help="simulated seconds")
+    parser.add_argument("--dt", type=float, default=FRAME_DT)
+    parser.add_argument("--out", default="results.csv")
+    parser.add_argument("--profile", default=None, help="write per-phase timings (json) here")
+    parser.add_argument("--trip-log", default=None, help="csv written while running (one row per arrived vehicle)")
+    parser.add_argument("--engine", choices=["frame", "event"], default="frame",
+                        help="frame: step every vehicle every tick, event: discrete-event engine")
+    parser.add_argument("--actuated", action="store_true", help="extend green while vehicles queue at stop lines")
+    parser.add_argument("--heatmap", default=None, help="npz path for per-cell occupancy/flow frames")
+    parser.add_argument("--heatmap-interval", type=float, default=10.0, help="simulated seconds per frame")
+    parser.add_argument("--heatmap-buckets", type=int, default=360, help="number of most recent frames kept")
+    parser.add_argument("--checkpoint", default=None, help="save the full simulation state here periodically")
+    parser.add_argument("--checkpoint-interval", type=float, default=300.0, help="simulated seconds between checkpoints")
+    parser.add_argument("--resume", action="store_true", help="continue from --checkpoint if the file exists")
+    args = parser.parse_args()
+
+    engine = EventSimulation if args.engine == "event" else Simulation
+    sim = engine(dt=args.dt, actuated_signals=args.actuated, trip_log=args.trip_log,
+                 profiler=PhaseTimer(enabled=bool(args.profile)), heatmap=args.heatmap,
+                 heatmap_interval=args.heatmap_interval, heatmap_buckets=args.heatmap_buckets)
+    if args.resume and args.checkpoint and os.path.exists(args.checkpoint):
+        sim.load_checkpoint(args.checkpoint)
+        print(f"[Info] resumed from {args.checkpoint} at {sim.sim_time:.0f}s")
+    t0 = time.perf_counter()
+    sim.run(args.max_time, args.checkpoint, args.checkpoint_interval)
+    elapsed = time.perf_counter() - t0
+    save_csv(args.out, sim.iter_results_csv())
+    if args.profile:
+        sim.profiler.dump(args.profile)
+    arrived = sum(1 for v in sim.vehicles if v.arrived)
+    print(f"{sim.sim_time:.1f}s simulated in {elapsed:.2f}s, arrived {arrived}/{len(sim.vehicles)} -> {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# Trimmed copy of sim_v3/heatmap.py, which is the canonical version: change that
+# one first and mirror the change here. The two apps run from their own folders
+# and share no modules, so this copy keeps only what Simulation uses (record,
+# save, checkpoints). The .npz layout must stay identical for heatmap_replay.py.
+import numpy as np
+
+# frames are uint16: values above 65535 are clipped
+FRAME_DTYPE = np.uint16
+FRAME_MAX = np.iinfo(FRAME_DTYPE).max
+
+class HeatmapRecorder:
+    # Per-cell congestion history in a fixed-size ring buffer of NumPy frames.
+    # One frame every `interval` simulated seconds:
+    #   occupancy[r, c] : vehicles on the cell at the end of the interval
+    #   flow[r, c]      : vehicles that entered the cell during the interval
+    # Once `buckets` frames exist the oldest one is overwritten, so memory stays
+    # at buckets x rows x cols x 4 bytes no matter how long the run is.
+    # save() writes times/occupancy/flow (oldest first) + the road mask with
+    # np.savez_compressed.
+    def __init__(self, rows, cols, road=None, interval=10.0, buckets=360):
+        self.rows = rows
+        self.cols = cols
+        self.interval = interval
+        self.buckets = buckets
+        self.road = np.ones((rows, cols), dtype=bool) if road is None else np.array(road, dtype=bool)
+        self.times = np.zeros(buckets)
+        self.occupancy = np.zeros((buckets, rows, cols), dtype=FRAME_DTYPE)
+        self.flow = np.zeros((buckets, rows, cols), dtype=FRAME_DTYPE)
+        self.head = 0   # next slot to write
+        self.count = 0  # frames filled (<= buckets)
+        self.next_time = interval
+
+    def checkpoint_state(self):
+        return {"times": self.times.copy(), "occupancy": self.occupancy.copy(), "flow": self.flow.copy(),
+                "head": self.head, "count": self.count, "next_time": self.next_time}
+
+    def restore_state(self, state):
+        self.times[:] = state["times"]
+        self.occupancy[:] = state["occupancy"]
+        self.flow[:] = state["flow"]
+        self.head = state["head"]
+        self.count = state["count"]
+        self.next_time = state["next_time"]
+
+    def due(self, now):
+        return now + 1e-9 >= self.next_time
+
+    def record(self, now, occupancy, flow):
+        # occupancy / flow: (rows, cols) arrays
+        i = self.head
+        self.times[i] = now
+        np.minimum(occupancy, FRAME_MAX, out=self.occupancy[i], casting="unsafe")
+        np.minimum(flow, FRAME_MAX, out=self.flow[i], casting="unsafe")
+        self.head = (i + 1) % self.buckets
+        self.count = min(self.count + 1, self.buckets)
+        self.next_time += self.interval
+        while self.next_time <= now:  # skip intervals missed during a long gap
+            self.next_time += self.interval
+
+    def save(self, path):
+        # frames oldest first
+        if self.count < self.buckets:
+            idx = np.arange(self.count)
+        else:
+            idx = (np.arange(self.buckets) + self.head) % self.buckets
+        np.savez_compressed(path, times=self.times[idx], occupancy=self.occupancy[idx], flow=self.flow[idx],
+                            road=self.road, interval=self.interval)
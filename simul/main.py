@@ -4,9 +4,11 @@ import threading
 from simulation import Simulation
 from utils import save_csv
 from stats_popup import StatsPopup
+from profiler import PhaseTimer
 
 MAIN_WIDTH, MAIN_HEIGHT = 640, 640
 BG_COLOR = (230, 230, 240)
+PROFILE_PATH = "profile.json"  # written on exit if profiling was turned on (P key)
 
 def run_stats_popup(sim):
     popup = StatsPopup(sim)
@@ -16,7 +18,8 @@ def main():
     pygame.init()
     screen = pygame.display.set_mode((MAIN_WIDTH, MAIN_HEIGHT))
     pygame.display.set_caption("Korean Road Simulation (Braess Paradox)")
-    sim = Simulation(screen)
+    profiler = PhaseTimer()
+    sim = Simulation(screen, profiler=profiler)
     clock = pygame.time.Clock()
     running = True
 
@@ -31,14 +34,20 @@ def main():
                 if event.key == pygame.K_SPACE:
                     sim.stop()
                     save_csv("results.csv", sim.get_results_csv())
+                if event.key == pygame.K_p:
+                    # phase timings are shown in the stats popup
+                    profiler.enabled = not profiler.enabled
 
-        screen.fill(BG_COLOR)
-        sim.draw_grid_background()
+        with profiler.phase("draw"):
+            screen.fill(BG_COLOR)
+            sim.draw_grid_background()
         sim.update()
         sim.render()
         pygame.display.flip()
         clock.tick(25)
 
+    if profiler.phases:
+        profiler.dump(PROFILE_PATH)
     pygame.quit()
     sys.exit()
 
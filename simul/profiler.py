@@ -0,0 +1,73 @@
+# Trimmed copy of sim_v3/profiler.py, which is the canonical version: change that
+# one first and mirror the change here. The two apps run from their own folders
+# and share no modules, so this copy keeps only what simul uses (phase, lines,
+# dump). It is read on the simulation thread only (see Simulation.publish_stats).
+import json
+import time
+from collections import deque
+from contextlib import nullcontext
+
+_NULL = nullcontext()  # shared no-op context used while profiling is off
+
+class _Phase:
+    # timer for one named phase (one object per name, reused)
+    __slots__ = ("samples", "start")
+
+    def __init__(self, window):
+        self.samples = deque(maxlen=window)  # last `window` durations (s)
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.samples.append(time.perf_counter() - self.start)
+        return False
+
+class PhaseTimer:
+    # Named phase timers with rolling percentiles.
+    #   with profiler.phase("update"):
+    #       ...
+    # When disabled, phase() returns a shared nullcontext: nothing is timed or stored.
+    def __init__(self, enabled=False, window=600):
+        self.enabled = enabled
+        self.window = window
+        self.phases = {}
+
+    def phase(self, name):
+        if not self.enabled:
+            return _NULL
+        p = self.phases.get(name)
+        if p is None:
+            p = self.phases[name] = _Phase(self.window)
+        return p
+
+    def summary(self):
+        # {phase: {"count", "mean", "p50", "p90", "p99", "max"}} in ms
+        result = {}
+        for name, p in self.phases.items():
+            if not p.samples:
+                continue
+            xs = sorted(p.samples)
+            n = len(xs)
+            pct = lambda q: xs[min(n - 1, int(q * n))] * 1000.0
+            result[name] = {
+                "count": n,
+                "mean": sum(xs) / n * 1000.0,
+                "p50": pct(0.5),
+                "p90": pct(0.9),
+                "p99": pct(0.99),
+                "max": xs[-1] * 1000.0,
+            }
+        return result
+
+    def lines(self):
+        return [
+            f"{name:<8} p50:{s['p50']:.2f}  p90:{s['p90']:.2f}  max:{s['max']:.2f} ms"
+            for name, s in self.summary().items()
+        ]
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2)
@@ -0,0 +1,167 @@
+import os
+import hashlib
+import numpy as np
+
+# Scenario loader: parses every layer of a scenario once into NumPy arrays,
+# validates them and caches the result as one .npz in <data>/__cache__/.
+# The cache key covers the path, mtime and size of every source file, so
+# editing any file (or adding a missing one) triggers a re-parse.
+
+CACHE_DIR = "__cache__"
+CACHE_FORMAT = 1  # bump when the array layout below changes
+
+# cell type codes stored in the cells layer (uint8)
+CODE_EMPTY = 0
+CODE_ROAD = 1
+CODE_XING = 2
+CODE_BUILD = 3
+CELL_CODES = {'R': CODE_ROAD, 'C': CODE_XING, 'B': CODE_BUILD}
+
+# name: (source key, number of leading int fields)
+INT_LAYERS = {
+    "capacity": ("capacity", 3),      # r, c, capacity (also the lane count)
+    "lane_change": ("lane_change", 3),  # r, c, allow
+    "speed_limit": ("speed_limit", 4),  # r, c, lane, km/h
+    "closed": ("closed", 2),          # r, c
+    "stop_line": ("stop_line", 2),    # r, c
+}
+
+SOURCES = ["road_map", "capacity", "lane_change", "turn_rule", "speed_limit", "closed", "stop_line"]
+
+def read_rows(path):
+    # comma separated fields of every non-empty, non-comment line
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            yield [p.strip() for p in line.split(",")]
+
+def int_table(path, n):
+    # (k, n) int array of the first n fields; short or malformed rows are skipped
+    rows = []
+    if os.path.exists(path):
+        for parts in read_rows(path):
+            if len(parts) < n:
+                continue
+            try:
+                rows.append([int(p) for p in parts[:n]])
+            except ValueError:
+                continue
+    return np.array(rows, dtype=np.int64).reshape(len(rows), n)
+
+def turn_table(path):
+    # r, c, dir, lane... -> one (r, c) / dir / lane entry per lane.
+    # a row without lanes still declares the direction (lane -1), which
+    # means no lane may turn that way.
+    rc, dirs, lanes = [], [], []
+    if os.path.exists(path):
+        for parts in read_rows(path):
+            if len(parts) < 4:
+                continue
+            try:
+                r, c = int(parts[0]), int(parts[1])
+                lanes_int = [int(x) for x in parts[3:] if x != ""]
+            except ValueError:
+                continue
+            for lane in lanes_int or [-1]:
+                rc.append((r, c))
+                dirs.append(parts[2])
+                lanes.append(lane)
+    return (np.array(rc, dtype=np.int64).reshape(len(rc), 2),
+            np.array(dirs, dtype=str),
+            np.array(lanes, dtype=np.int64))
+
+def parse_map(path):
+    lines = []
+    if not os.path.exists(path):
+        print(f"[Warning] road map file not found: {path}. Using empty map.")
+        return np.zeros((0, 0), dtype=np.uint8)
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            lines.append(line)
+    rows = len(lines)
+    cols = max(len(line) for line in lines) if rows > 0 else 0
+    # the file is written top row first; row 0 of the grid is the last line.
+    # short rows are padded with buildings (same as the old draw fallback)
+    text = "".join(line.ljust(cols, 'B') for line in reversed(lines))
+    chars = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+    cells = np.full(rows * cols, CODE_EMPTY, dtype=np.uint8)
+    for ch, code in CELL_CODES.items():
+        cells[chars == ord(ch)] = code
+    return cells.reshape(rows, cols)
+
+def parse_scenario(paths):
+    layers = {"cells": parse_map(paths["road_map"])}
+    for name, (source, n) in INT_LAYERS.items():
+        layers[name] = int_table(paths[source], n)
+    layers["turn_rc"], layers["turn_dir"], layers["turn_lane"] = turn_table(paths["turn_rule"])
+    if not os.path.exists(paths["capacity"]):
+        print(f"[Warning] capacity file not found: {paths['capacity']}. Using default capacities.")
+    if not os.path.exists(paths["closed"]):
+        print(f"[Info] closed_cells file not found: {paths['closed']}. Continuing with no closed cells.")
+    for problem in validate(layers):
+        print(f"[Warning] {problem}")
+    return layers
+
+def validate(layers):
+    # return: list of problems (the data is kept as is)
+    problems = []
+    rows, cols = layers["cells"].shape
+    coords = [(name, layers[name][:, :2]) for name in INT_LAYERS]
+    coords.append(("turn_rule", layers["turn_rc"]))
+    for name, rc in coords:
+        outside = (rc[:, 0] < 0) | (rc[:, 0] >= rows) | (rc[:, 1] < 0) | (rc[:, 1] >= cols)
+        if outside.any():
+            r, c = rc[outside][0].tolist()
+            problems.append(f"{name}: {int(outside.sum())} entries outside the {rows}x{cols} map, e.g. ({r}, {c})")
+    if (layers["capacity"][:, 2] <= 0).any():
+        problems.append("capacity: non-positive capacity / lane count")
+    if (layers["speed_limit"][:, 3] <= 0).any():
+        problems.append("speed_limit: non-positive speed limit")
+    bad_dirs = sorted(set(layers["turn_dir"].tolist()) - set("UDLRS"))
+    if bad_dirs:
+        problems.append(f"turn_rule: unknown directions {bad_dirs}")
+    return problems
+
+def cache_key(paths):
+    h = hashlib.sha1(str(CACHE_FORMAT).encode())
+    for name in SOURCES:
+        path = os.path.abspath(paths[name])
+        try:
+            st = os.stat(path)
+            stamp = f"{st.st_mtime_ns}:{st.st_size}"
+        except OSError:
+            stamp = "missing"
+        h.update(f"{name}={path}@{stamp};".encode("utf-8"))
+    return h.hexdigest()[:16]
+
+def load_scenario(paths, cache_dir=None):
+    # paths: {source name: file path} for every name in SOURCES
+    # cache_dir defaults to <road map dir>/__cache__; use "" to disable the cache
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(paths["road_map"])), CACHE_DIR)
+    if not cache_dir:
+        return parse_scenario(paths)
+
+    cache_path = os.path.join(cache_dir, f"scenario-{cache_key(paths)}.npz")
+    if os.path.exists(cache_path):
+        try:
+            with np.load(cache_path) as data:
+                return {name: data[name] for name in data.files}
+        except (OSError, ValueError, KeyError):
+            pass  # broken cache file; parse again
+
+    layers = parse_scenario(paths)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, **layers)
+        os.replace(tmp, cache_path)
+    except OSError:
+        pass  # read-only data folder: just run without the cache
+    return layers
@@ -1,11 +1,40 @@
-import time
 import os
+import heapq
 
 class SignalMap:
+    # Signal controller driven by the simulation clock.
+    # Phase changes are scheduled as events in a heap; advance(now) pops the
+    # events that are due, updates the signals and notifies listeners. Between
+    # phase changes nothing is recomputed and next_change_time() tells an
+    # engine how long it may skip ahead.
     def __init__(self, path):
         self.patterns = self.load_patterns(path)
+        # patterns parsed once into per-signal phase tables
+        self.timeline = self.compile(self.patterns)
+        self.signal_index = {sig[0]: i for i, sig in enumerate(self.timeline)}  # center -> timeline index
+        self.left_cells = self.compile_left_cells(self.patterns)
+        self.max_cycle = max((sig[1] for sig in self.timeline), default=0)
+        # 3x3 blocks around the signal centers (intersection side of the stop lines)
+        self.signal_cells = {cell for sig in self.timeline for cell in self.block(sig[0])}
+
+        # runtime state per signal (same order as timeline)
+        self.phases = [None] * len(self.timeline)   # active phase index
+        self.offsets = [0] * len(self.timeline)     # seconds the cycle was shifted by extensions
+        self.extended = [0] * len(self.timeline)    # extension used in the current phase
+        self.events = []                            # heap of (time, signal index)
+        self.clock = 0
         self.state = {}
-        self.last_update = time.time()
+        self.listeners = []
+
+        # actuated control (see enable_actuation)
+        self.actuated = False
+        self.queue_fn = None
+        self.queue_cells = []
+        self.min_queue = 0
+        self.extend_step = 0
+        self.max_extension = 0
+
+        self.seek(0)
 
     def load_patterns(self, path):
         patterns = {}
@@ -32,41 +61,174 @@ class SignalMap:
                 patterns[(r, c)] = patterns.get((r, c), []) + [(pattern_str, duration)]
         return patterns
 
-    def get_states(self):
-        now = time.time()
-        self.state = {}
-        for rc, pat_seq in self.patterns.items():
+    def parse_pattern(self, pstr):
+        dir_colors = {}
+        for dpart in pstr.split(';'):
+            if '-' in dpart:
+                dir, color = dpart.split('-')
+                dir_colors[dir] = color
+        return dir_colors
+
+    def compile(self, patterns):
+        # One entry per signal: (center, cycle, phase_at, remain, colors)
+        #   phase_at[t] - phase index active at second t of the cycle (None = dark)
+        #   remain[t]   - seconds until the phase changes, counted from second t
+        #   colors[k]   - "N" color of phase k
+        timeline = []
+        for rc, pat_seq in patterns.items():
             total = sum(p[1] for p in pat_seq)
             if total <= 0:
                 continue
-            t = int(now) % total
-            acc = 0
-            for pstr, dur in pat_seq:
-                if acc <= t < acc + dur:
-                    dir_colors = {}
-                    for dpart in pstr.split(';'):
-                        if '-' in dpart:
-                            dir, color = dpart.split('-')
-                            dir_colors[dir] = color
-                    r, c = rc
-                    # Apply the "N" color to a 3x3 block centered on the signal for visualization
-                    for dr in [-1, 0, 1]:
-                        for dc in [-1, 0, 1]:
-                            self.state[(r + dr, c + dc)] = dir_colors.get('N', 'red')
-                    break
-                acc += dur
+            colors = [self.parse_pattern(pstr).get('N', 'red') for pstr, dur in pat_seq]
+            phase_at = []
+            for t in range(total):
+                acc = 0
+                active = None
+                for k, (pstr, dur) in enumerate(pat_seq):
+                    if acc <= t < acc + dur:
+                        active = k
+                        break
+                    acc += dur
+                phase_at.append(active)
+            remain = [1] * total
+            for t in range(total - 2, -1, -1):
+                if phase_at[t] == phase_at[t + 1]:
+                    remain[t] = remain[t + 1] + 1
+            timeline.append((rc, total, phase_at, remain, colors))
+        return timeline
+
+    def compile_left_cells(self, patterns):
+        # cells within one step of a signal that has a protected left phase
+        cells = set()
+        for (r0, c0), pat_seq in patterns.items():
+            if any('L-green' in pstr or 'L-yellow' in pstr for pstr, dur in pat_seq):
+                for dr in [-1, 0, 1]:
+                    for dc in [-1, 0, 1]:
+                        cells.add((r0 + dr, c0 + dc))
+        return cells
+
+    def block(self, center):
+        r, c = center
+        return {(r + dr, c + dc) for dr in [-1, 0, 1] for dc in [-1, 0, 1]}
+
+    def enable_actuation(self, approaches, queue_fn, min_queue=2, extend_step=2, max_extension=10):
+        # Extend a green phase by extend_step seconds (up to max_extension per
+        # phase) while at least min_queue vehicles wait upstream of the stop lines
+        # around the signal. approaches: {stop-line cell: cells vehicles queue on
+        # before entering it} (see Grid.approach_cells); queue_fn(cells) counts them.
+        self.actuated = True
+        self.queue_fn = queue_fn
+        self.min_queue = min_queue
+        self.extend_step = extend_step
+        self.max_extension = max_extension
+        self.queue_cells = []
+        for rc, total, phase_at, remain, colors in self.timeline:
+            cells = set()
+            for stop in self.block(rc):
+                cells |= approaches.get(stop, set())
+            self.queue_cells.append(cells)
+
+    def add_listener(self, fn):
+        # fn(time, center, old_phase, new_phase) is called on every phase change
+        self.listeners.append(fn)
+
+    def seek(self, now):
+        # Jump straight to simulation time `now` using the phase tables (O(1) per signal).
+        # Extensions are dropped; the fixed-time plan is resumed.
+        t = int(now)
+        self.clock = t
+        self.events = []
+        for i, (rc, total, phase_at, remain, colors) in enumerate(self.timeline):
+            k = t % total
+            self.phases[i] = phase_at[k]
+            self.offsets[i] = 0
+            self.extended[i] = 0
+            self.events.append((t + remain[k], i))
+        heapq.heapify(self.events)
+        self.rebuild_state()
+
+    def checkpoint_state(self):
+        # dynamic part only (checkpoints); tables come from the pattern file
+        return {"phases": list(self.phases), "offsets": list(self.offsets),
+                "extended": list(self.extended), "events": list(self.events), "clock": self.clock}
+
+    def restore_state(self, state):
+        self.phases = list(state["phases"])
+        self.offsets = list(state["offsets"])
+        self.extended = list(state["extended"])
+        self.events = list(state["events"])
+        self.clock = state["clock"]
+        self.rebuild_state()
+
+    def next_change_time(self):
+        return self.events[0][0] if self.events else float('inf')
+
+    def advance(self, now):
+        # Process every phase event due at or before `now`.
+        # return: list of (time, center, old_phase, new_phase)
+        t = int(now)
+        if t < self.clock or (not self.actuated and t - self.clock > self.max_cycle):
+            # clock went backwards (new run) or jumped far ahead
+            self.seek(now)
+            return []
+        self.clock = t
+        changes = []
+        while self.events and self.events[0][0] <= t:
+            when, i = heapq.heappop(self.events)
+            rc, total, phase_at, remain, colors = self.timeline[i]
+            old = self.phases[i]
+            if self.should_extend(i, old):
+                self.extended[i] += self.extend_step
+                self.offsets[i] += self.extend_step
+                heapq.heappush(self.events, (when + self.extend_step, i))
+                continue
+            k = (when - self.offsets[i]) % total
+            self.phases[i] = phase_at[k]
+            self.extended[i] = 0
+            heapq.heappush(self.events, (when + remain[k], i))
+            if self.phases[i] != old:
+                changes.append((when, rc, old, self.phases[i]))
+        if changes:
+            self.rebuild_state()
+            for when, rc, old, new in changes:
+                for fn in self.listeners:
+                    fn(when, rc, old, new)
+        return changes
+
+    def should_extend(self, i, phase):
+        if not self.actuated or phase is None or not self.queue_cells[i]:
+            return False
+        colors = self.timeline[i][4]
+        if colors[phase] != 'green' or self.extended[i] + self.extend_step > self.max_extension:
+            return False
+        return self.queue_fn(self.queue_cells[i]) >= self.min_queue
+
+    def rebuild_state(self):
+        self.state = {}
+        for (rc, total, phase_at, remain, colors), active in zip(self.timeline, self.phases):
+            if active is None:
+                continue
+            r, c = rc
+            # Apply the "N" color to a 3x3 block centered on the signal for visualization
+            for dr in [-1, 0, 1]:
+                for dc in [-1, 0, 1]:
+                    self.state[(r + dr, c + dc)] = colors[active]
+
+    def phase(self, center, now=None):
+        # phase index of the signal at `center` (O(1) via signal_index)
+        if now is not None:
+            self.advance(now)
+        i = self.signal_index.get(center)
+        return None if i is None else self.phases[i]
+
+    def get_states(self, now):
+        # now: simulation time in seconds (required; the phase tables are indexed by sim time)
+        self.advance(now)
         return self.state
 
-    def get_state(self, rc):
-        states = self.get_states()
+    def get_state(self, rc, now):
+        states = self.get_states(now)
         return states.get(rc, None)
 
     def has_left_signal(self, rc):
-        for center, pat_seq in self.patterns.items():
-            r0, c0 = center
-            r, c = rc
-            if abs(r - r0) <= 1 and abs(c - c0) <= 1:
-                for pstr, dur in pat_seq:
-                    if 'L-green' in pstr or 'L-yellow' in pstr:
-                        return True
-        return False
\ No newline at end of file
+        return rc in self.left_cells
\ No newline at end of file
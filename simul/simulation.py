@@ -1,15 +1,43 @@
 import os
-import time
+import pickle
+from collections import namedtuple
 from grid import Grid
-from vehicle import Vehicle
+from vehicle import Vehicle, FRAME_DT, ARRIVED
+from utils import CsvStream
 from sig_nal import SignalMap
+from profiler import PhaseTimer
+from heatmap import HeatmapRecorder
+
+CHECKPOINT_VERSION = 1  # bump when the checkpoint layout changes
+PROFILE_REFRESH = 1.0   # simulated seconds between profiler lines in the stats snapshot
+
+RESULT_HEADER = ["vehicle_id","start_r","start_c","target_r","target_c","depart_time","arrive_time","total_time","distance_m","avg_speed_kmh","path","used_roads"]
+
+# Immutable per-tick stats, replaced (never mutated) at the end of each update().
+# Other threads (StatsPopup) read sim.stats without scanning vehicles or locking:
+# rebinding one attribute is atomic, so a reader always sees one whole tick.
+# profile holds the formatted PhaseTimer lines (empty while profiling is off).
+StatsSnapshot = namedtuple("StatsSnapshot", [
+    "sim_time", "arrived", "total", "avg_time", "min_time", "max_time",
+    "avg_speed", "avg_distance", "avg_congestion", "profile",
+])
 
 # BASE_PATH is set relative to this file's directory to avoid cwd issues
 BASE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
 
 class Simulation:
-    def __init__(self, screen):
+    def __init__(self, screen=None, dt=FRAME_DT, actuated_signals=False, trip_log=None, profiler=None,
+                 heatmap=None, heatmap_interval=10.0, heatmap_buckets=360):
+        # screen=None runs headless (no pygame display needed)
+        # actuated_signals: extend green while vehicles queue in front of the stop lines
+        # trip_log: csv path; each vehicle's result row is written when it arrives
+        #           (rows for vehicles still driving are added at stop())
+        # profiler: PhaseTimer timing update/render (off by default)
+        # heatmap: npz path; per-cell occupancy/flow frames every heatmap_interval
+        #          simulated seconds (last heatmap_buckets kept), saved at stop()
         self.screen = screen
+        self.dt = dt
+        self.profiler = profiler or PhaseTimer()
         self.grid = Grid(
             os.path.join(BASE_PATH, "road_map.txt"),
             os.path.join(BASE_PATH, "capacity_map.txt"),
@@ -20,14 +48,34 @@ class Simulation:
             os.path.join(BASE_PATH, "stop_line.txt")
         )
         self.signal_map = SignalMap(os.path.join(BASE_PATH, "signal_patterns.txt"))
+        if actuated_signals:
+            self.signal_map.enable_actuation(self.approach_cells(), self.queue_length)
         self.vehicles = []
         self.results = []
         self.finished = False
-        self.start_time = time.time()
+        self.sim_time = 0.0
+        self.trip_log = CsvStream(trip_log, RESULT_HEADER) if trip_log else None
         self.load_vehicles(os.path.join(BASE_PATH, "vehicle_data.txt"))
+        self.heatmap_path = heatmap
+        self.heatmap = None
+        if heatmap:
+            self.heatmap = HeatmapRecorder(self.grid.rows, self.grid.cols, self.grid.passable[1:-1, 1:-1],
+                                           heatmap_interval, heatmap_buckets)
+            self.grid.entries = {}  # count cell entries from now on (not the initial placement)
+        # running totals over arrived vehicles (updated in on_arrive)
+        self.arrived_count = 0
+        self.time_sum = 0.0
+        self.time_min = None
+        self.time_max = 0.0
+        self.distance_sum = 0.0
+        self.speed_sum = 0.0
+        self.profile_lines = ()
+        self.profile_at = 0.0
+        self.publish_stats()
 
     def load_vehicles(self, path):
         self.vehicles.clear()
+        self.grid.reset_occupancy()
         if not os.path.exists(path):
             print(f"[Info] vehicle data file not found: {path}")
             return
@@ -47,77 +95,209 @@ class Simulation:
                 except ValueError:
                     # malformed line; skip
                     continue
+        for v in self.vehicles:
+            self.grid.enter_cell(v.cell)
+
+    def approach_cells(self, depth=2):
+        # stop-line cell -> cells upstream of it (vehicles wait there on red)
+        blocked = self.signal_map.signal_cells
+        return {rc: self.grid.approach_cells(rc, depth, blocked) for rc in self.grid.stop_line}
+
+    def queue_length(self, cells):
+        # number of waiting vehicles on the given cells
+        occupancy = self.grid.occupancy
+        return sum(occupancy.get(rc, 0) for rc in cells)
 
     def update(self):
         if self.finished:
             return
-        now = time.time()
-        for v in self.vehicles:
-            if not v.arrived:
-                v.move(self.grid, self.signal_map, self.vehicles, now - self.start_time)
-        if self.vehicles and all(v.arrived for v in self.vehicles):
+        # signal phases / actuation decisions for this tick, before any vehicle looks at them
+        if int(self.sim_time) >= self.signal_map.next_change_time():
+            self.signal_map.advance(self.sim_time)
+        with self.profiler.phase("update"):
+            for v in self.vehicles:
+                if not v.arrived:
+                    if v.move(self.grid, self.signal_map, self.vehicles, self.sim_time, self.dt) == ARRIVED:
+                        self.on_arrive(v)
+        if self.trip_log:
+            self.trip_log.poll(self.sim_time)
+        self.sim_time += self.dt
+        self.record_heatmap()
+        self.publish_stats()
+        if self.vehicles and self.arrived_count == len(self.vehicles):
             self.stop()
 
+    def on_arrive(self, v):
+        t = v.arrive_time - v.depart_time
+        self.arrived_count += 1
+        self.time_sum += t
+        self.time_min = t if self.time_min is None else min(self.time_min, t)
+        self.time_max = max(self.time_max, t)
+        self.distance_sum += v.total_distance
+        if t > 0:
+            self.speed_sum += v.total_distance / t * 3.6
+        if self.trip_log:
+            self.trip_log.write(self.csv_row(self.result_row(v)), self.sim_time)
+
+    def record_heatmap(self):
+        if self.heatmap is None or not self.heatmap.due(self.sim_time):
+            return
+        grid = self.grid
+        self.heatmap.record(self.sim_time, grid.cell_array(grid.occupancy), grid.cell_array(grid.entries))
+        grid.entries.clear()
+
+    def run(self, max_time=3600.0, checkpoint=None, checkpoint_interval=300.0):
+        # Advance by fixed dt as fast as possible until every vehicle arrives
+        # or max_time simulated seconds have passed.
+        # checkpoint: path saved every checkpoint_interval simulated seconds
+        next_checkpoint = self.next_checkpoint_time(checkpoint_interval)
+        while not self.finished and self.sim_time < max_time:
+            self.update()
+            if checkpoint and self.sim_time >= next_checkpoint:
+                self.save_checkpoint(checkpoint)
+                next_checkpoint = self.next_checkpoint_time(checkpoint_interval)
+        self.stop()
+        return self.results
+
+    def next_checkpoint_time(self, interval):
+        # first multiple of interval after the current time (same points after resuming)
+        return (int(self.sim_time // interval) + 1) * interval
+
     def stop(self):
         if self.finished:
             return
         self.finished = True
-        self.results = [
-            {
-                "id": v.id,
-                "start": (v.start_r, v.start_c),
-                "target": (v.target_r, v.target_c),
-                "depart": v.depart_time if v.depart_time is not None else 0.0,
-                "arrive": v.arrive_time if v.arrive_time is not None else 0.0,
-                "total": (v.arrive_time - v.depart_time) if v.arrived and v.depart_time is not None else None,
-                "distance": v.total_distance,
-                "avg_speed_kmh": (v.total_distance / (v.arrive_time - v.depart_time) * 3.6) if v.arrived and (v.arrive_time - v.depart_time) and (v.arrive_time - v.depart_time) > 0 else 0,
-                "path": v.path,
-                "used_roads": v.used_roads
-            }
-            for v in self.vehicles
-        ]
+        self.results = [self.result_row(v) for v in self.vehicles]
+        if self.trip_log:
+            for v in self.vehicles:
+                if not v.arrived:
+                    self.trip_log.write(self.csv_row(self.result_row(v)))
+            self.trip_log.close()
+        if self.heatmap is not None:
+            self.heatmap.save(self.heatmap_path)
+
+    def result_row(self, v):
+        return {
+            "id": v.id,
+            "start": (v.start_r, v.start_c),
+            "target": (v.target_r, v.target_c),
+            "depart": v.depart_time if v.depart_time is not None else 0.0,
+            "arrive": v.arrive_time if v.arrive_time is not None else 0.0,
+            "total": (v.arrive_time - v.depart_time) if v.arrived and v.depart_time is not None else None,
+            "distance": v.total_distance,
+            "avg_speed_kmh": (v.total_distance / (v.arrive_time - v.depart_time) * 3.6) if v.arrived and (v.arrive_time - v.depart_time) and (v.arrive_time - v.depart_time) > 0 else 0,
+            "path": v.path,
+            "used_roads": v.used_roads
+        }
 
     def render(self):
-        self.grid.draw(self.screen, self.signal_map.get_states(), self.vehicles)
-        for v in self.vehicles:
-            v.draw(self.screen, self.grid)
+        with self.profiler.phase("render"):
+            self.grid.draw(self.screen, self.signal_map.get_states(self.sim_time), self.vehicles)
+            for v in self.vehicles:
+                v.draw(self.screen, self.grid)
 
     def draw_grid_background(self):
         self.grid.draw_background(self.screen)
 
+    # ---- checkpoints ----
+    # save_checkpoint() / load_checkpoint() continue a run bit-identically
+    # (trip_log is truncated back to the checkpoint and continued).
+    # Only the dynamic state is saved; map layers, signal tables and routing
+    # caches are rebuilt from the data folder. Everything goes into one pickle,
+    # so vehicles shared by several containers (event heap, waiter lists) stay shared.
+    def checkpoint_state(self):
+        return {
+            "version": CHECKPOINT_VERSION,
+            "sim_time": self.sim_time,
+            "vehicles": self.vehicles,
+            "totals": (self.arrived_count, self.time_sum, self.time_min, self.time_max,
+                       self.distance_sum, self.speed_sum),
+            "grid": self.grid.checkpoint_state(),
+            "signals": self.signal_map.checkpoint_state(),
+            "trip_log": self.trip_log.checkpoint_state() if self.trip_log else None,
+            "heatmap": self.heatmap.checkpoint_state() if self.heatmap is not None else None,
+        }
+
+    def restore_state(self, state):
+        if state["version"] != CHECKPOINT_VERSION:
+            raise ValueError(f"checkpoint version {state['version']} != {CHECKPOINT_VERSION}")
+        self.sim_time = state["sim_time"]
+        self.vehicles = state["vehicles"]
+        (self.arrived_count, self.time_sum, self.time_min, self.time_max,
+         self.distance_sum, self.speed_sum) = state["totals"]
+        self.grid.restore_state(state["grid"])
+        self.signal_map.restore_state(state["signals"])
+        if self.trip_log and state["trip_log"]:
+            self.trip_log.restore_state(state["trip_log"])
+        if self.heatmap is not None and state["heatmap"] is not None:
+            self.heatmap.restore_state(state["heatmap"])
+        self.publish_stats()
+
+    def save_checkpoint(self, path):
+        # write to a temp file first so a crash mid-write keeps the previous checkpoint
+        tmp = f"{path}.tmp"
+        with open(tmp, 'wb') as f:
+            pickle.dump(self.checkpoint_state(), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def load_checkpoint(self, path):
+        with open(path, 'rb') as f:
+            self.restore_state(pickle.load(f))
+
+    def publish_stats(self):
+        # build a new snapshot from the running totals (no per-vehicle scan for arrivals)
+        n = self.arrived_count
+        # profiler deques are only read here, on the simulation thread
+        if not self.profiler.enabled:
+            self.profile_lines = ()
+        elif not self.profile_lines or self.sim_time >= self.profile_at:
+            self.profile_lines = tuple(self.profiler.lines())
+            self.profile_at = self.sim_time + PROFILE_REFRESH
+        self.stats = StatsSnapshot(
+            sim_time=self.sim_time,
+            arrived=n,
+            total=len(self.vehicles),
+            avg_time=self.time_sum / n if n else 0,
+            min_time=self.time_min or 0,
+            max_time=self.time_max,
+            avg_speed=self.speed_sum / n if n else 0,
+            avg_distance=self.distance_sum / n if n else 0,
+            avg_congestion=self.grid.get_average_congestion(),
+            profile=self.profile_lines,
+        )
+
     def get_live_stats(self):
-        arrived = sum(1 for v in self.vehicles if v.arrived)
-        total = len(self.vehicles)
-        times = [v.arrive_time - v.depart_time for v in self.vehicles if v.arrived and v.depart_time is not None and v.arrive_time is not None]
-        avg_time = sum(times)/len(times) if times else 0
-        max_time = max(times) if times else 0
-        min_time = min(times) if times else 0
-        if arrived:
-            avg_speed = sum((v.total_distance / (v.arrive_time - v.depart_time) * 3.6) for v in self.vehicles if v.arrived and (v.arrive_time - v.depart_time) > 0) / arrived
-        else:
-            avg_speed = 0
-        avg_congestion = self.grid.get_average_congestion(self.vehicles)
-        return [
+        # safe to call from another thread: only reads the latest snapshot
+        s = self.stats
+        lines = [
             "[Live Traffic Stats]",
-            f"Arrived vehicles: {arrived}/{total}",
-            f"Average travel time: {avg_time:.2f}s",
-            f"Average speed: {avg_speed:.2f} km/h",
-            f"Min: {min_time:.2f}s | Max: {max_time:.2f}s",
-            f"Average congestion: {avg_congestion:.2f}",
+            f"Arrived vehicles: {s.arrived}/{s.total}",
+            f"Average travel time: {s.avg_time:.2f}s",
+            f"Average speed: {s.avg_speed:.2f} km/h",
+            f"Min: {s.min_time:.2f}s | Max: {s.max_time:.2f}s",
+            f"Average congestion: {s.avg_congestion:.2f}",
             "(Press SPACE to show/save results)",
             ""
         ]
+        if s.profile:
+            # phase timings (toggle with P in main.py)
+            lines[-1:] = s.profile
+        return lines
 
-    def get_results_csv(self):
-        header = ["vehicle_id","start_r","start_c","target_r","target_c","depart_time","arrive_time","total_time","distance_m","avg_speed_kmh","path","used_roads"]
-        rows = []
+    def csv_row(self, r):
+        return [
+            r["id"], r["start"][0], r["start"][1], r["target"][0], r["target"][1],
+            f"{r['depart']:.2f}", f"{r['arrive']:.2f}", f"{r['total']:.2f}" if r['total'] is not None else "",
+            f"{r['distance']:.2f}", f"{r['avg_speed_kmh']:.2f}",
+            ";".join(str(x) for x in r["path"]),
+            ";".join(str(x) for x in r["used_roads"])
+        ]
+
+    def iter_results_csv(self):
+        # header + one row at a time (save_csv accepts any iterable)
+        yield RESULT_HEADER
         for r in self.results:
-            rows.append([
-                r["id"], r["start"][0], r["start"][1], r["target"][0], r["target"][1],
-                f"{r['depart']:.2f}", f"{r['arrive']:.2f}", f"{r['total']:.2f}" if r['total'] is not None else "",
-                f"{r['distance']:.2f}", f"{r['avg_speed_kmh']:.2f}",
-                ";".join(str(x) for x in r["path"]),
-                ";".join(str(x) for x in r["used_roads"])
-            ])
-        return [header] + rows
\ No newline at end of file
+            yield self.csv_row(r)
+
+    def get_results_csv(self):
+        return list(self.iter_results_csv())
@@ -1,5 +1,18 @@
 import csv
-from collections import deque
+import heapq
+import math
+import os
+from array import array
+import numpy as np
+
+CELL_SIZE_M = 5  # 1 셀이 실제 몇 미터인지(간단한 상수)
+INF = float("inf")
+ROUTE_CACHE_CELLS = 1 << 22  # goal_tree 캐시 전체 셀 수 상한 (트리 1 개 = len(grid.mask) x 8 바이트, 약 32MB)
+
+def to_cell(x, y):
+    # 차량 위치 → 현재 셀 (r, c). 셀 중심이 정수 좌표이므로 가장 가까운 칸 (.5 는 올림)
+    # int() 버림은 왼쪽/위로 갈 때만 일찍 칸을 넘기고, round() 는 .5 를 짝수 쪽으로 보낸다.
+    return math.floor(y + 0.5), math.floor(x + 0.5)
 
 def save_csv(fname, data):
     with open(fname, 'w', encoding='utf-8', newline='') as f:
@@ -7,27 +20,208 @@ def save_csv(fname, data):
         for row in data:
             writer.writerow(row)
 
-def shortest_path(grid, rows, cols, start, goal):
-    # BFS 기반 단순 경로탐색 (격자 상하좌우)
-    q = deque()
-    q.append((start, [start]))
-    visited = {start}
-    while q:
-        curr, path = q.popleft()
-        if curr == goal:
-            return path
-        for dr, dc in [(-1,0),(1,0),(0,-1),(0,1)]:
-            nr, nc = curr[0] + dr, curr[1] + dc
-            if 0 <= nr < rows and 0 <= nc < cols:
-                try:
-                    cell = grid[nr][nc]
-                except Exception:
-                    continue
-                if cell not in ('R','C'):
-                    continue
-                npos = (nr, nc)
-                if npos in visited:
-                    continue
-                visited.add(npos)
-                q.append((npos, path + [npos]))
-    return []
\ No newline at end of file
+class CsvStream:
+    # csv rows appended in batches while the simulation runs.
+    # rows are buffered and written when batch_size rows are waiting or
+    # flush_interval simulated seconds passed since the last write, so a
+    # crash loses at most one batch and memory stays bounded.
+    # the file is (re)created with the header on the first write, so constructing
+    # a stream does not clobber a log that a checkpoint is about to continue.
+    def __init__(self, fname, header, batch_size=100, flush_interval=60.0):
+        self.fname = fname
+        self.header = header
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rows = []
+        self.last_flush = 0.0
+        self.started = False
+
+    def checkpoint_state(self):
+        # unwritten rows + file size at checkpoint time
+        size = os.path.getsize(self.fname) if self.started else 0
+        return {"rows": list(self.rows), "last_flush": self.last_flush, "started": self.started, "size": size}
+
+    def restore_state(self, state):
+        # drop rows written after the checkpoint; they are written again after resuming
+        self.started = state["started"]
+        if self.started:
+            with open(self.fname, 'ab') as f:
+                f.truncate(state["size"])
+        self.rows = list(state["rows"])
+        self.last_flush = state["last_flush"]
+
+    def write(self, row, now=None):
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush(now)
+
+    def poll(self, now):
+        if self.rows and now - self.last_flush >= self.flush_interval:
+            self.flush(now)
+
+    def flush(self, now=None):
+        if now is not None:
+            self.last_flush = now
+        if not self.started:
+            self.write_rows([self.header], 'w')
+            self.started = True
+        if self.rows:
+            self.write_rows(self.rows, 'a')
+            self.rows = []
+
+    def write_rows(self, rows, mode):
+        with open(self.fname, mode, encoding='utf-8', newline='') as f:
+            csv.writer(f).writerows(rows)
+
+    def close(self):
+        self.flush()
+
+def cell_costs(grid, speed_kmh=None, lane=0):
+    # 셀별 진입 비용 (덧댄 평면 인덱스 기준, 진입 불가 = INF)
+    # speed_kmh 가 주어지면 Vehicle.move 와 같은 규칙으로 min(차량 속도, 차선 제한속도) 로
+    # 한 셀을 지나는 시간(초), 없으면 모든 셀 1 (칸 수 최단).
+    # return: (costs 리스트, 한 칸 비용의 하한 = A* 휴리스틱 단위)
+    if grid.cost_cache_version != grid.version:
+        grid.cost_cache = {}
+        grid.cost_cache_version = grid.version
+    key = (speed_kmh, lane)
+    hit = grid.cost_cache.get(key)
+    if hit is not None:
+        return hit
+
+    if speed_kmh is None:
+        step = 1.0
+        costs = np.where(grid.passable, 1.0, INF).ravel()
+    else:
+        step = CELL_SIZE_M / (speed_kmh * 1000.0 / 3600.0) if speed_kmh > 0 else INF
+        costs = np.where(grid.passable, step, INF).ravel()
+        for (r, c, l), limit in grid.speed_limit.items():
+            if l != lane or not grid.is_road(r, c):
+                continue
+            speed = min(speed_kmh, limit)
+            costs[grid.index(r, c)] = CELL_SIZE_M / (speed * 1000.0 / 3600.0) if speed > 0 else INF
+    for r, c in grid.closed_cells:
+        if 0 <= r < grid.rows and 0 <= c < grid.cols:
+            costs[grid.index(r, c)] = INF
+
+    hit = (costs.tolist(), step)
+    grid.cost_cache[key] = hit
+    return hit
+
+def goal_tree(grid, goal, speed_kmh=None, lane=0):
+    # goal 에서 거꾸로 Dijkstra: 셀별 goal 까지 남은 시간 (덧댄 평면 인덱스, 도달 불가 = INF)
+    # 비용 규칙은 shortest_path 와 같다 (다음 셀 진입 시간, 봉쇄 셀/진입 불가 셀은 경유 안 함).
+    # (goal, speed, lane) 별로 grid.route_cache 에 두고 모든 차량이 같이 쓴다.
+    # 트리 수 x 셀 수가 ROUTE_CACHE_CELLS 를 넘으면 최근에 안 쓴 것부터 버리고 (큰 맵일수록 적게 보관),
+    # grid.version 이 바뀌면 전부 버린다.
+    cache = grid.route_cache
+    if grid.route_cache_version != grid.version:
+        cache.clear()
+        grid.route_cache_version = grid.version
+    key = (goal, speed_kmh, lane)
+    tree = cache.get(key)
+    if tree is not None:
+        cache.move_to_end(key)
+        return tree
+
+    costs, _ = cell_costs(grid, speed_kmh, lane)
+    offsets = grid.offsets()
+    tree = array("d", [INF]) * len(costs)
+    g = grid.index(*goal)
+    if costs[g] != INF:
+        tree[g] = 0.0
+        heap = [(0.0, g)]
+        while heap:
+            d, j = heapq.heappop(heap)
+            if d > tree[j]:
+                continue
+            # 이웃 i 에서 j 로 들어가는 비용 = costs[j] (i 는 지나갈 수 있는 셀만)
+            nd = d + costs[j]
+            for o in offsets:
+                i = j + o
+                if nd < tree[i] and costs[i] != INF:
+                    tree[i] = nd
+                    heapq.heappush(heap, (nd, i))
+
+    cache[key] = tree
+    while len(cache) > max(1, ROUTE_CACHE_CELLS // len(tree)):
+        cache.popitem(last=False)
+    return tree
+
+def cached_path(grid, start, goal, speed_kmh=None, lane=0):
+    # shortest_path 와 같은 결과 형식 (시간 최단 경로, 없으면 [])
+    # goal_tree 를 따라 "진입 비용 + 남은 시간" 이 가장 작은 이웃으로만 가므로 탐색이 없다.
+    # (같은 비용의 경로가 여러 개면 shortest_path 와 다른 쪽을 고를 수 있다)
+    for r, c in (start, goal):
+        if not (0 <= r < grid.rows and 0 <= c < grid.cols):
+            return []
+    if start == goal:
+        return [start]
+    tree = goal_tree(grid, goal, speed_kmh, lane)
+    costs, _ = cell_costs(grid, speed_kmh, lane)
+    offsets = grid.offsets()
+    g = grid.index(*goal)
+    i = grid.index(*start)
+    path = [start]
+    while i != g:
+        best, best_j = INF, -1
+        for o in offsets:
+            j = i + o
+            v = costs[j] + tree[j]
+            if v < best:
+                best, best_j = v, j
+        if best_j < 0:
+            return []
+        i = best_j
+        path.append(grid.coords(i))
+    return path
+
+def shortest_path(grid, start, goal, speed_kmh=None, lane=0):
+    # A* 경로탐색 (격자 상하좌우). 비용 = 다음 셀 진입 시간 (cell_costs 참고)
+    # 봉쇄 셀(closed_cells)과 제한속도 0 인 셀은 지나가지 않는다.
+    # 휴리스틱 = 맨해튼 거리 x 한 칸 비용 하한 → 항상 시간 최단 경로
+    # 경로는 부모 포인터로 마지막에 한 번만 복원한다.
+    for r, c in (start, goal):
+        if not (0 <= r < grid.rows and 0 <= c < grid.cols):
+            return []
+    if start == goal:
+        return [start]
+    costs, step = cell_costs(grid, speed_kmh, lane)
+    offsets = grid.offsets()
+    w = grid.width
+    s = grid.index(*start)
+    g = grid.index(*goal)
+    if costs[g] == INF:
+        return []
+    gr, gc = divmod(g, w)
+
+    dist = {s: 0.0}
+    prev = {s: -1}
+    sr, sc = divmod(s, w)
+    heap = [((abs(sr - gr) + abs(sc - gc)) * step, 0.0, s)]
+    found = False
+    while heap:
+        _, d, i = heapq.heappop(heap)
+        if i == g:
+            found = True
+            break
+        if d > dist[i]:
+            continue
+        for o in offsets:
+            j = i + o
+            nd = d + costs[j]
+            if nd < dist.get(j, INF):
+                dist[j] = nd
+                prev[j] = i
+                jr, jc = divmod(j, w)
+                heapq.heappush(heap, (nd + (abs(jr - gr) + abs(jc - gc)) * step, nd, j))
+    if not found:
+        return []
+
+    path = []
+    i = g
+    while i != -1:
+        path.append(grid.coords(i))
+        i = prev[i]
+    path.reverse()
+    return path
\ No newline at end of file
@@ -1,10 +1,20 @@
 import pygame
 import math
-from utils import shortest_path
+from utils import cached_path, to_cell, CELL_SIZE_M
+FRAME_DT = 1.0 / 25.0  # 기본 시뮬레이션 tick (초)
 
-CELL_SIZE_M = 5  # 1 셀이 실제 몇 미터인지(간단한 상수)
+# move() 결과
+MOVED = "moved"
+WAIT_SIGNAL = "signal"  # 신호 바뀔 때까지 대기
+WAIT_GRID = "grid"      # 도로 구조(봉쇄 셀 등)가 바뀔 때까지 대기
+ARRIVED = "arrived"
 
 class Vehicle:
+    # fixed attribute slots (no per-instance __dict__)
+    __slots__ = ("id", "start_r", "start_c", "dir", "speed_kmh", "target_r", "target_c", "lane",
+                 "x", "y", "arrived", "depart_time", "arrive_time", "path",
+                 "used_roads", "used_set", "total_distance", "cell", "path_version")
+
     def __init__(self, id, start_r, start_c, dir, speed_kmh, target_r, target_c, lane=0):
         self.id = id
         self.start_r = start_r
@@ -20,56 +30,97 @@ class Vehicle:
         self.depart_time = None
         self.arrive_time = None
         self.path = []
-        self.used_roads = []
+        self.path_version = None  # path 를 계산한 grid.version
+        self.used_roads = []   # 지나간 셀 (처음 지난 순서)
+        self.used_set = set()  # used_roads 의 membership 검사용
         self.total_distance = 0.0
+        self.cell = to_cell(self.x, self.y)  # 현재 셀 (grid.occupancy 에 등록된 칸)
 
-    def move(self, grid, signal_map, vehicles, sim_time):
-        curr_rc = (int(self.y), int(self.x))
+    def move(self, grid, signal_map, vehicles, sim_time, dt=FRAME_DT):
+        # return: MOVED / WAIT_SIGNAL / WAIT_GRID / ARRIVED (frame engine ignores it,
+        # event engine uses it to decide when to look at this vehicle again)
         if self.arrived:
-            return
+            return ARRIVED
         if self.depart_time is None:
             self.depart_time = sim_time
-        if int(self.x) == self.target_c and int(self.y) == self.target_r:
+        if self.at_target():
             self.arrived = True
             self.arrive_time = sim_time
-            self.path.append((int(self.y), int(self.x)))
-            return
+            self.path.append(self.cell)
+            grid.leave_cell(self.cell)
+            return ARRIVED
+        next_rc = self.next_cell(grid)
+        if next_rc is None:
+            return WAIT_GRID
+        wait = self.check_rules(grid, signal_map, next_rc, sim_time)
+        if wait:
+            return wait
+        self.step_towards(next_rc, self.speed_ms(grid, next_rc), dt)
+        # 셀 경계를 넘었으면 점유 카운터 갱신
+        rc = to_cell(self.x, self.y)
+        if rc != self.cell:
+            grid.leave_cell(self.cell)
+            grid.enter_cell(rc)
+            self.cell = rc
+        return MOVED
+
+    def at_target(self):
+        return self.cell == (self.target_r, self.target_c)
+
+    def next_cell(self, grid):
+        # 다음 진입 셀 (없으면 None: 봉쇄 셀 위이거나 경로 없음)
+        curr_rc = self.cell
         # 봉쇄된 셀이면 대기(또는 경로 재계산)
         if curr_rc in grid.closed_cells:
-            return
-        # 경로 계산 (BFS)
-        if not self.path or (self.path and self.path[0] != curr_rc):
-            self.path = shortest_path(grid.map, grid.rows, grid.cols, curr_rc, (self.target_r, self.target_c))
+            return None
+        # 경로 계산 (제한속도 기반 시간 최단, goal 별 공유 트리에서 바로 꺼냄)
+        # 경로대로 한 칸 나아갔으면 앞만 잘라 쓰고, 경로를 벗어났거나 도로 구조가 바뀌었으면 다시 계산
+        path = self.path
+        if self.path_version == grid.version and len(path) > 1 and path[1] == curr_rc:
+            del path[0]
+        elif not path or path[0] != curr_rc or self.path_version != grid.version:
+            self.path = cached_path(grid, curr_rc, (self.target_r, self.target_c), self.speed_kmh, self.lane)
+            self.path_version = grid.version
             if self.path and self.path[0] != curr_rc:
                 self.path.insert(0, curr_rc)
         if not self.path or len(self.path) < 2:
-            return
-        next_r, next_c = self.path[1]
-        next_rc = (next_r, next_c)
+            return None
+        return self.path[1]
+
+    def check_rules(self, grid, signal_map, next_rc, sim_time):
+        # next_rc 진입 가능하면 None, 아니면 대기 사유
         # 차선 변경 허용/금지(단순화: 진입 셀 기준)
         if not grid.lane_change_rule.get(next_rc, True) and self.lane != self.lane:
-            return
+            return WAIT_GRID
         # 방향별 전용 차로 검사
         turn_dir = self.get_next_turn_direction(next_rc)
         allowed_lanes = grid.turn_rule.get(next_rc, {}).get(turn_dir, [self.lane])
         if self.lane not in allowed_lanes:
-            return
+            return WAIT_GRID
         # 비보호 좌회전 처리
         if turn_dir == "L" and not signal_map.has_left_signal(next_rc):
-            sig = signal_map.get_state(next_rc)
+            sig = signal_map.get_state(next_rc, sim_time)
             if sig not in ("green", "yellow"):
-                return
-        # 속도 제한(차선별)
-        limit = grid.speed_limit.get((next_r, next_c, self.lane), int(self.speed_kmh))
-        speed_ms = min(self.speed_kmh, limit) * 1000.0 / 3600.0
-        # 프레임당 이동거리 (초당 프레임을 25로 가정)
-        move_dist_m = speed_ms * (1.0 / 25.0)
-        move_dist_cells = move_dist_m / CELL_SIZE_M
+                return WAIT_SIGNAL
         # 정지선과 신호
         if next_rc in grid.stop_line:
-            sig = signal_map.get_state(next_rc)
+            sig = signal_map.get_state(next_rc, sim_time)
             if sig == "red":
-                return
+                return WAIT_SIGNAL
+        return None
+
+    def speed_ms(self, grid, next_rc):
+        # 속도 제한(차선별)
+        next_r, next_c = next_rc
+        limit = grid.speed_limit.get((next_r, next_c, self.lane), int(self.speed_kmh))
+        return min(self.speed_kmh, limit) * 1000.0 / 3600.0
+
+    def step_towards(self, next_rc, speed_ms, dt):
+        curr_rc = self.cell
+        next_r, next_c = next_rc
+        # tick 당 이동거리 (시뮬레이션 시간 dt 기준)
+        move_dist_m = speed_ms * dt
+        move_dist_cells = move_dist_m / CELL_SIZE_M
         # 실제 이동
         dx = next_c - self.x
         dy = next_r - self.y
@@ -84,12 +135,13 @@ class Vehicle:
         self.y += dy * ratio
         self.total_distance += move_dist_m
         # 기록
-        if curr_rc not in self.used_roads:
+        if curr_rc not in self.used_set:
+            self.used_set.add(curr_rc)
             self.used_roads.append(curr_rc)
 
     def draw(self, screen, grid):
         cs = grid.cell_size
-        lanes = grid.lane_count.get((int(self.y), int(self.x)), 1)
+        lanes = grid.lane_count.get(self.cell, 1)
         lane_width = max(1, cs // lanes)
         px = int(self.x * cs + lane_width // 2 + (self.lane * lane_width))
         py = int(self.y * cs + cs // 2)
@@ -115,7 +167,7 @@ class Vehicle:
         return 'S'
 
     def get_next_turn_direction(self, next_rc):
-        curr_r, curr_c = int(self.y), int(self.x)
+        curr_r, curr_c = self.cell
         next_r, next_c = next_rc
         if next_r < curr_r:
             return 'U'